@@ -1,6 +1,42 @@
 from pyiron_workflow import as_function_node
 from typing import Optional
 import ase as _ase
+from functools import lru_cache as _lru_cache
+from compact_structure import CompactAtoms as _CompactAtoms
+
+_hexagonal_orientations = {
+    '[0, 0, 0, 1]': [0, 0, 1], '[1, -1, 0, 0]': [0, 1, 0], '[-1, 1, 0, 0]': [0, -1, 0], '[1, 0, -1, 0]': [1, 0, 0],
+    '[-1, 0, 1, 0]': [-1, 0, 0],'[2, -1, -1, 0]': [1, 0, 0],'[-2, 1, 1, 0]': [-1, 0, 0], '[1, -2, 1, 0]': [0, -1, 0],
+    '[-1, 2, -1, 0]': [0, 1, 0]
+}
+
+# Voigt index -> tensor index pair
+_voigt_pairs = ((0, 0), (1, 1), (2, 2), (1, 2), (2, 0), (0, 1))
+
+def _bond_matrices(Q):
+    """
+    Bond (6x6) stress transformation matrices of the rotation matrices Q, for a
+    single (3, 3) or a stack of (n, 3, 3) rotations with the new axes as rows.
+    """
+    import numpy as np
+
+    i, j = np.array(_voigt_pairs).T
+    # QQ[..., I, J, k, l] = Q[i_I, k] * Q[j_I, l]
+    QQ = np.einsum('...ik,...jl->...ijkl', Q, Q)[..., i, j, :, :]
+    K = QQ[..., i, j] # Q[i_I, k_J] Q[j_I, l_J]
+    K[..., 3:] += QQ[..., j[3:], i[3:]] # + Q[i_I, l_J] Q[j_I, k_J] for the shear columns
+    return K
+
+def _base_stiffness(c11, c12, c13, c33, c44, crystal):
+    import numpy as np
+
+    if crystal=='c14' or crystal=='hcp':
+        C_base = np.array([[c11, c12, c13, 0, 0, 0], [c12, c11, c13, 0, 0, 0], [c13, c13, c33, 0, 0, 0], 
+                           [0, 0, 0, c44, 0, 0], [0, 0, 0, 0, c44, 0], [0, 0, 0, 0, 0, (c11-c12)/2]]) 
+    else:
+        C_base = np.array([[c11, c12, c12, 0, 0, 0], [c12, c11, c12, 0, 0, 0], [c12, c12, c11, 0, 0, 0], 
+                           [0, 0, 0, c44, 0, 0], [0, 0, 0, 0, c44, 0], [0, 0, 0, 0, 0, c44]]) 
+    return C_base
 
 @as_function_node("rotated_elast_tensor")
 def rotate_elasticity_tensor(
@@ -34,39 +70,20 @@ def rotate_elasticity_tensor(
     if isinstance(z_indices, str):
         z_indices = [int(i) for i in z_indices.split()]
     
-    # base crystal orientation
-    e1 = [1, 0, 0]; e2 = [0., 1., 0.]; e3 = [0, 0, 1]
-    orient_dict = {'[0, 0, 0, 1]': [0, 0, 1], '[1, -1, 0, 0]': [0, 1, 0], '[-1, 1, 0, 0]': [0, -1, 0], '[1, 0, -1, 0]': [1, 0, 0], 
-            '[-1, 0, 1, 0]': [-1, 0, 0],'[2, -1, -1, 0]': [1, 0, 0],'[-2, 1, 1, 0]': [-1, 0, 0], '[1, -2, 1, 0]': [0, -1, 0],
-           '[-1, 2, -1, 0]': [0, 1, 0]}
     if crystal=='c14' or crystal=='hcp':
-        m1 = orient_dict[str(x_indices)]
-        m2 = orient_dict[str(y_indices)]
-        m3 = orient_dict[str(z_indices)]
+        m1 = _hexagonal_orientations[str(x_indices)]
+        m2 = _hexagonal_orientations[str(y_indices)]
+        m3 = _hexagonal_orientations[str(z_indices)]
     else:
         m1 = x_indices
         m2 = y_indices
         m3 = z_indices 
-    m1 /= np.linalg.norm(m1); m2 /= np.linalg.norm(m2); m3 /= np.linalg.norm(m3)
-    Q = np.array([[np.matmul(m1,e1), np.matmul(m1,e2), np.matmul(m1,e3)], 
-                  [np.matmul(m2,e1), np.matmul(m2,e2), np.matmul(m2,e3)], [np.matmul(m3,e1), np.matmul(m3,e2), np.matmul(m3,e3)]])
-    K1 = np.array([[Q[0,0]**2, Q[0,1]**2, Q[0,2]**2], [Q[1,0]**2, Q[1,1]**2, Q[1,2]**2], [Q[2,0]**2, Q[2,1]**2, Q[2,2]**2]])
-    K2 = np.array([[Q[0,1]*Q[0,2], Q[0,2]*Q[0,0], Q[0,0]*Q[0,1]], [Q[1,1]*Q[1,2], Q[1,2]*Q[1,0], Q[1,0]*Q[1,1]], [Q[2,1]*Q[2,2], Q[2,2]*Q[2,0], Q[2,0]*Q[2,1]]])
-    K3 = np.array([[Q[1,0]*Q[2,0], Q[1,1]*Q[2,1], Q[1,2]*Q[2,2]], [Q[2,0]*Q[0,0], Q[2,1]*Q[0,1], Q[2,2]*Q[0,2]], [Q[0,0]*Q[1,0], Q[0,1]*Q[1,1], Q[0,2]*Q[1,2]]])
-    K4 = np.array([[Q[1,1]*Q[2,2]+Q[1,2]*Q[2,1], Q[1,2]*Q[2,0]+Q[1,0]*Q[2,2], Q[1,0]*Q[2,1]+Q[1,1]*Q[2,0]], 
-                   [Q[2,1]*Q[0,2]+Q[2,2]*Q[0,1], Q[2,2]*Q[0,0]+Q[2,0]*Q[0,2], Q[2,0]*Q[0,1]+Q[2,1]*Q[0,0]], 
-                   [Q[0,1]*Q[1,2]+Q[0,2]*Q[1,1], Q[0,2]*Q[1,0]+Q[0,0]*Q[1,2], Q[0,0]*Q[1,1]+Q[0,1]*Q[1,0]]])
-    KK1 = np.concatenate((K1, 2*K2), axis=1)
-    KK2 = np.concatenate((K3, K4), axis=1)
-    KK = np.concatenate((KK1, KK2), axis=0)
+    Q = np.array([m1, m2, m3], dtype=float)
+    Q /= np.linalg.norm(Q, axis=1)[:, None]
+    KK = _bond_matrices(Q)
 
     # Material stiffness tensor
-    if crystal=='c14' or crystal=='hcp':
-        C_base = np.array([[c11, c12, c13, 0, 0, 0], [c12, c11, c13, 0, 0, 0], [c13, c13, c33, 0, 0, 0], 
-                           [0, 0, 0, c44, 0, 0], [0, 0, 0, 0, c44, 0], [0, 0, 0, 0, 0, (c11-c12)/2]]) 
-    else:
-        C_base = np.array([[c11, c12, c12, 0, 0, 0], [c12, c11, c12, 0, 0, 0], [c12, c12, c11, 0, 0, 0], 
-                           [0, 0, 0, c44, 0, 0], [0, 0, 0, 0, c44, 0], [0, 0, 0, 0, 0, c44]]) 
+    C_base = _base_stiffness(c11, c12, c13, c33, c44, crystal)
     C = np.dot(np.dot(KK, C_base), np.transpose(KK)) # Rotation of the material stiffness tensor
 
     return C
@@ -87,100 +104,172 @@ def theor_K_griffith_plane_strain(
 
     import numpy as np
 
-    QQ = np.array([[C[0,0], C[0,5], C[0,4]], [C[0,5], C[5,5], C[4,5]], [C[0,4], C[4,5], C[4,4]]])
-    R = np.array([[C[0,5], C[0,1], C[0,3]], [C[5,5], C[1,5], C[3,5]], [C[4,5], C[1,4], C[3,4]]])
-    T = np.array([[C[5,5], C[1,5], C[3,5]], [C[1,5], C[1,1], C[1,3]], [C[3,5], C[1,3], C[3,3]]])
-    N1 = -1 * np.dot(np.linalg.inv(T),np.transpose(R))
-    N2 = np.linalg.inv(T)
-    N3 = np.dot(np.dot(R, np.linalg.inv(T)), np.transpose(R)) - QQ
-    NN1 = np.concatenate((N1, N2), axis=1)
-    NN2 = np.concatenate((N3, np.transpose(N1)), axis=1)
-    N = np.concatenate((NN1, NN2), axis=0)
-
-    #--- finding eigenvector and eigen values, ...
-    [v, u] = np.linalg.eig(N) # v - eigenvalues, v - eigenvectors
-    a1 = [[u[0,0]], [u[1,0]], [u[2,0]]]
-    pp1 = v[0]
-    b1 = np.dot(np.transpose(R)+np.dot(pp1, T),a1)
-
-    a2 = [[u[0,2]], [u[1,2]], [u[2,2]]]
-    pp2 = v[2]
-    b2 = np.dot(np.transpose(R)+np.dot(pp2, T),a2)
-
-    a3 = [[u[0,4]], [u[1,4]], [u[2,4]]]
-    pp3 = v[4]
-    b3 = np.dot(np.transpose(R)+np.dot(pp3, T),a3)
-    AA = np.concatenate((a1, a2, a3), axis=1)
-    BB = np.concatenate((b1, b2, b3), axis=1)
-
-    L = 0.5 * np.real(1j*np.dot(AA,np.linalg.inv(BB)))
-    lambda_coeff = np.linalg.inv(L)[1,1]
+    lambda_coeff = get_stroh_solution(C)['lambda_coeff']
     K_GG = np.sqrt(2*gamma_s*lambda_coeff*10**9)*10**(-6)
     # print("Theoretical K Griffith is " + str(K_GG) + " MPa*m^1/2")
     
     return K_GG
 
-@as_function_node("crack_param_dict")
-def anisotropic_crack_params(
-    C
+@as_function_node("k_griffith")
+def screen_K_griffith_orientations(
+    c11: Optional[float|int],
+    c12: Optional[float|int],
+    c13: Optional[float|int],
+    c33: Optional[float|int],
+    c44: Optional[float|int],
+    crystal: Optional[str],
+    crack_planes,
+    crack_fronts,
+    gamma_s,
 ):
+    '''
+    Returns the theoretical Griffith fracture toughness in MPa sqrt(m) for many
+    (crack plane, crack front) pairs at once, the same value rotate_elasticity_tensor
+    and theor_K_griffith_plane_strain give for y_indices=crack plane,
+    z_indices=crack front and x_indices=crack plane x crack front.
+    The Bond matrices, rotated tensors and Stroh eigenproblems of all orientations
+    are computed as stacked arrays. Pairs which are not perpendicular give nan.
+
+
+        Parameters:
+            c11, c12, c13, c33, c44: elastic constants in GPA
+            crystal: hcp/c14/cubic(fcc, bcc etc.)
+            crack_planes: (n, 3) crack plane normals, miller indices (cubic) or
+                          4-index directions known to rotate_elasticity_tensor (hcp, c14)
+            crack_fronts: (n, 3) crack front directions, same convention
+            gamma_s: Surface energy in J/m2, scalar or one value per orientation
+    '''
 
     import numpy as np
-    
-    QQ = np.array([[C[0,0], C[0,5], C[0,4]], [C[0,5], C[5,5], C[4,5]], [C[0,4], C[4,5], C[4,4]]])
-    R = np.array([[C[0,5], C[0,1], C[0,3]], [C[5,5], C[1,5], C[3,5]], [C[4,5], C[1,4], C[3,4]]])
-    T = np.array([[C[5,5], C[1,5], C[3,5]], [C[1,5], C[1,1], C[1,3]], [C[3,5], C[1,3], C[3,3]]])
-    N1 = -1 * np.dot(np.linalg.inv(T),np.transpose(R))
-    N2 = np.linalg.inv(T)
-    N3 = np.dot(np.dot(R, np.linalg.inv(T)), np.transpose(R)) - QQ
-    NN1 = np.concatenate((N1, N2), axis=1)
-    NN2 = np.concatenate((N3, np.transpose(N1)), axis=1)
-    N = np.concatenate((NN1, NN2), axis=0)
+
+    def to_vectors(indices):
+        indices = [[int(i) for i in m.split()] if isinstance(m, str) else [int(i) for i in m] for m in indices]
+        if crystal=='c14' or crystal=='hcp':
+            indices = [_hexagonal_orientations[str(m)] for m in indices]
+        vectors = np.array(indices, dtype=float).reshape(-1, 3)
+        return vectors / np.linalg.norm(vectors, axis=1)[:, None]
+
+    m2 = to_vectors(crack_planes)
+    m3 = to_vectors(crack_fronts)
+    m1 = np.cross(m2, m3)
+    is_valid = np.abs(np.sum(m2 * m3, axis=1)) < 1e-8
+    m1[~is_valid] = [1, 0, 0]; m2[~is_valid] = [0, 1, 0]; m3[~is_valid] = [0, 0, 1]
+    Q = np.stack((m1, m2, m3), axis=1)
+    KK = _bond_matrices(Q)
+    C = np.einsum('nij,jk,nlk->nil', KK, _base_stiffness(c11, c12, c13, c33, c44, crystal), KK)
+
+    _, A, B = _stroh_eigensystem(C)
+    L = 0.5 * np.real(1j*A @ np.linalg.inv(B))
+    lambda_coeff = np.linalg.inv(L)[:, 1, 1]
+    K_GG = np.sqrt(2*np.asarray(gamma_s)*lambda_coeff*10**9)*10**(-6)
+    K_GG[~is_valid] = np.nan
+
+    return K_GG
+
+def get_stroh_solution(C):
+    """
+    Returns the Stroh solution of the rotated elasticity tensor C as a dict of
+    read-only arrays: p (eigenvalues), A, B and B_inv (normalized eigenvectors),
+    L (0.5 Re(i A B_inv)) and lambda_coeff (inv(L)[1,1]).
+    The solution is cached per C, repeated calls with the same C, e.g. sweeps over
+    gamma_s or K, skip the eigenproblem.
+    """
+    import numpy as np
+
+    C = np.ascontiguousarray(C, dtype=float)
+    # a new dict per call, so callers cannot replace entries of the cached one
+    return dict(_stroh_solution(C.tobytes()))
+
+def _stroh_eigensystem(C):
+    """
+    Stroh eigenvalues p (n, 3) and the not normalized eigenvectors A and B (n, 3, 3)
+    for a stack of rotated elasticity tensors C (n, 6, 6), one of each complex
+    conjugate pair of eigenvalues is kept.
+    """
+    import numpy as np
+
+    QQ_index = np.array([[(0,0), (0,5), (0,4)], [(0,5), (5,5), (4,5)], [(0,4), (4,5), (4,4)]])
+    R_index = np.array([[(0,5), (0,1), (0,3)], [(5,5), (1,5), (3,5)], [(4,5), (1,4), (3,4)]])
+    T_index = np.array([[(5,5), (1,5), (3,5)], [(1,5), (1,1), (1,3)], [(3,5), (1,3), (3,3)]])
+    QQ = C[:, QQ_index[..., 0], QQ_index[..., 1]]
+    R = C[:, R_index[..., 0], R_index[..., 1]]
+    T = C[:, T_index[..., 0], T_index[..., 1]]
+    R_t = np.transpose(R, (0, 2, 1))
+    T_inv = np.linalg.inv(T)
+    N1 = -1 * T_inv @ R_t
+    N3 = R @ T_inv @ R_t - QQ
+    N = np.block([[N1, T_inv], [N3, np.transpose(N1, (0, 2, 1))]])
 
     #--- finding eigenvector and eigen values, ...
-    [v, u] = np.linalg.eig(N) # v - eigenvalues, v - eigenvectors
-    a1 = [[u[0,0]], [u[1,0]], [u[2,0]]]
-    pp1 = v[0]
-    b1 = np.dot(np.transpose(R)+np.dot(pp1, T),a1)
-
-    a2 = [[u[0,2]], [u[1,2]], [u[2,2]]]
-    pp2 = v[2]
-    b2 = np.dot(np.transpose(R)+np.dot(pp2, T),a2)
-
-    a3 = [[u[0,4]], [u[1,4]], [u[2,4]]]
-    pp3 = v[4]
-    b3 = np.dot(np.transpose(R)+np.dot(pp3, T),a3)
-    AA = np.concatenate((a1, a2, a3), axis=1)
-    BB = np.concatenate((b1, b2, b3), axis=1)
-
-    p = np.array([pp1, pp2, pp3])
-
-    AB = np.concatenate((AA, BB), axis=0)
-    J = np.zeros(np.shape(u))
-    for i in range(3):
-        J[i, i+3] = 1
-        J[i+3, i] = 1
-    AB_n = np.zeros(np.shape(u), dtype=complex)    
-    for i in range(3):
-        AB_n[:, i] = AB[:, i] / np.sqrt(np.matmul(AB[:, i].T, np.matmul(J, AB[:, i])))
-
-    A = AB_n[0:3, 0:3]
-    B = AB_n[3:6, 0:3]    
+    [v, u] = np.linalg.eig(N) # v - eigenvalues, u - eigenvectors
+    p = v[:, [0, 2, 4]]
+    A = u[:, 0:3, [0, 2, 4]]
+    # b_k = (R^T + p_k T) a_k
+    B = np.einsum('nij,njk->nik', R_t, A) + np.einsum('nij,njk->nik', T, A) * p[:, None, :]
+    return p, A, B
+
+@_lru_cache(maxsize=256)
+def _stroh_solution(C_bytes):
+    import numpy as np
+
+    C = np.frombuffer(C_bytes, dtype=float).reshape(6, 6)
+    p, A, B = (x[0] for x in _stroh_eigensystem(C[None]))
+
+    # normalization of the columns of [A; B] with J = [[0, I], [I, 0]]
+    norm = np.sqrt(2 * np.sum(A * B, axis=0))
+    A = A / norm
+    B = B / norm
     B_inv = np.linalg.inv(B)
 
-    return {'A': A, 'B_inv': B_inv, 'p': p}
+    L = 0.5 * np.real(1j*np.dot(A, B_inv))
+    solution = {
+        'p': p,
+        'A': A,
+        'B': B,
+        'B_inv': B_inv,
+        'L': L,
+        'lambda_coeff': np.linalg.inv(L)[1,1],
+    }
+    for value in solution.values():
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+    return solution
+
+@as_function_node("crack_param_dict")
+def anisotropic_crack_params(
+    C
+):
+
+    stroh = get_stroh_solution(C)
+
+    return {'A': stroh['A'], 'B_inv': stroh['B_inv'], 'p': stroh['p']}
 
 @as_function_node("cracked_structure")
 def displace_atoms_crack_aniso(
-    atoms: _ase.Atoms, 
+    atoms: _ase.Atoms|_CompactAtoms, 
     K_I: Optional[int|float],
     K_II: Optional[int|float],
     K_III: Optional[int|float],
-    crack_params: Optional[dict]
+    crack_params: Optional[dict],
+    chunk_size: Optional[int] = 2**16,
+    n_workers: Optional[int] = 1,
 ):
+    '''
+    Returns a copy of the structure displaced by the anisotropic crack tip field.
+    The displacement of all atoms is computed with array operations, chunk_size
+    atoms at a time, to bound the memory of the complex (3x3) intermediate terms.
+
+
+        Parameters:
+            atoms: structure with the crack front along z through the center of the cell
+            K_I, K_II, K_III: stress intensity factors
+            crack_params: A, B_inv and p from anisotropic_crack_params
+            chunk_size: number of atoms processed at once
+            n_workers: number of threads processing the chunks in parallel
+    '''
 
     import numpy as np
-    import math
+    from chunked_execution import for_each_chunk
 
     A = crack_params['A']
     B_inv = crack_params['B_inv']
@@ -188,21 +277,129 @@ def displace_atoms_crack_aniso(
 
     crack_struct = atoms.copy()
     
-    pos_xyz = crack_struct.get_positions()
+    pos_xyz = crack_struct.positions
     X_c = crack_struct.cell[0][0]/2
     Y_c = crack_struct.cell[1][1]/2
-    K_vector = [K_II, K_I, K_III]              # mode I and II are swapped below hence this order to keep the conventional modes
-    
-    for iii in range(len(pos_xyz)):
-        x1 = pos_xyz[iii, 0] - X_c
-        x2 = pos_xyz[iii, 1] - Y_c
-        x3 = pos_xyz[iii, 2]    
-        r = np.sqrt(x1**2 + x2**2)
-        teta = math.atan2(x2, x1)
-        p_diag = np.zeros((3, 3), dtype=complex)
-        for i in range(3):
-            p_diag[i, i] = np.sqrt(np.cos(teta) + p[i] * np.sin(teta))
-        disp = np.sqrt(2 * r/np.pi) * np.real(A @ p_diag @ B_inv) @ K_vector
-        crack_struct.positions[iii] += disp
+    K_vector = np.array([K_II, K_I, K_III])    # mode I and II are swapped below hence this order to keep the conventional modes
+
+    def displace_chunk(start, stop):
+        pos_xyz[start:stop] += _crack_tip_displacement(
+            pos_xyz[start:stop, 0] - X_c, pos_xyz[start:stop, 1] - Y_c, A, B_inv, p, K_vector
+        )
+
+    for_each_chunk(displace_chunk, len(pos_xyz), chunk_size=chunk_size, n_workers=n_workers)
     
-    return crack_struct
\ No newline at end of file
+    return crack_struct
+
+
+@as_function_node("file_names")
+def write_crack_K_ramp(
+    atoms: _ase.Atoms|_CompactAtoms,
+    K_values: list,
+    crack_params: Optional[dict],
+    directory: Optional[str] = 'K_ramp',
+    file_format: Optional[str] = 'lammps-dump',
+    chunk_size: Optional[int] = 2**16,
+    n_workers: Optional[int] = 1,
+):
+    '''
+    Writes the structure displaced by the anisotropic crack tip field for every
+    (K_I, K_II, K_III) in K_values, the same configurations as repeated calls of
+    displace_atoms_crack_aniso, and returns the written file names.
+    The displacement is linear in K, so the displacements for unit K_I, K_II and
+    K_III are computed once and stored as a memory map in directory. Every
+    configuration is then only a scaled sum of these fields, computed chunk_size
+    atoms at a time while it is written, so the cost of a ramp is one displacement
+    evaluation plus I/O and no configuration is held in memory.
+    The atom numbers are written as LAMMPS types 1, 2, ... in increasing order.
+
+
+        Parameters:
+            atoms: structure with the crack front along z through the center of the cell
+            K_values: list of (K_I, K_II, K_III) stress intensity factors
+            crack_params: A, B_inv and p from anisotropic_crack_params
+            directory: output directory, also holds the unit displacement fields
+            file_format: lammps-dump (one file with a frame per K) or lammps-data (one file per K)
+            chunk_size: number of atoms processed at once
+            n_workers: number of threads computing the unit displacement fields
+    '''
+
+    import os
+    import numpy as np
+    from ase.data import atomic_masses
+    from chunked_execution import for_each_chunk
+    from structure_io import (
+        write_lammps_data_atoms,
+        write_lammps_data_header,
+        write_lammps_dump_atoms,
+        write_lammps_dump_header,
+    )
+
+    A = crack_params['A']
+    B_inv = crack_params['B_inv']
+    p = crack_params['p']
+
+    os.makedirs(directory, exist_ok=True)
+    pos_xyz = atoms.positions
+    cell = np.asarray(atoms.cell)
+    X_c = cell[0][0]/2
+    Y_c = cell[1][1]/2
+    n_atoms = len(pos_xyz)
+
+    # unit_fields[:, :, k] is the displacement for K_vector = e_k, K_vector is ordered (K_II, K_I, K_III)
+    unit_fields = np.lib.format.open_memmap(
+        os.path.join(directory, 'unit_displacements.npy'), mode='w+', dtype=np.float64, shape=(n_atoms, 3, 3)
+    )
+
+    def unit_field_chunk(start, stop):
+        unit_fields[start:stop] = _crack_tip_displacement(
+            pos_xyz[start:stop, 0] - X_c, pos_xyz[start:stop, 1] - Y_c, A, B_inv, p, np.eye(3)
+        )
+
+    for_each_chunk(unit_field_chunk, n_atoms, chunk_size=chunk_size, n_workers=n_workers)
+    unit_fields.flush()
+
+    numbers, types = np.unique(atoms.numbers, return_inverse=True)
+    types = types + 1
+    masses = [atomic_masses[n] for n in numbers]
+    ids = np.arange(1, n_atoms + 1)
+
+    def write_atoms(f, write, K_vector):
+        for start in range(0, n_atoms, chunk_size):
+            stop = min(start + chunk_size, n_atoms)
+            write(f, ids=ids[start:stop], types=types[start:stop], positions=pos_xyz[start:stop] + unit_fields[start:stop] @ K_vector)
+
+    file_names = []
+    if file_format == 'lammps-dump':
+        file_name = os.path.join(directory, 'K_ramp.dump')
+        with open(file_name, 'w') as f:
+            for step, (K_I, K_II, K_III) in enumerate(K_values):
+                write_lammps_dump_header(f, timestep=step, n_atoms=n_atoms, cell=cell, pbc=atoms.pbc)
+                write_atoms(f, write_lammps_dump_atoms, np.array([K_II, K_I, K_III]))
+        file_names.append(file_name)
+    elif file_format == 'lammps-data':
+        for step, (K_I, K_II, K_III) in enumerate(K_values):
+            file_name = os.path.join(directory, f'K_ramp_{step:04d}.data')
+            with open(file_name, 'w') as f:
+                write_lammps_data_header(f, n_atoms=n_atoms, cell=cell, masses=masses)
+                write_atoms(f, write_lammps_data_atoms, np.array([K_II, K_I, K_III]))
+            file_names.append(file_name)
+    else:
+        raise ValueError("Unknown file_format:", file_format)
+
+    return file_names
+
+def _crack_tip_displacement(x1, x2, A, B_inv, p, K_vector):
+    """
+    Anisotropic crack tip displacement of atoms at (x1, x2) relative to the crack tip,
+    K_vector is ordered (K_II, K_I, K_III). Returns an (n, 3) array, or (n, 3, m)
+    for a (3, m) K_vector.
+    """
+    import numpy as np
+
+    r = np.sqrt(x1**2 + x2**2)
+    teta = np.arctan2(x2, x1)
+    p_diag = np.sqrt(np.cos(teta)[:, None] + p[None, :] * np.sin(teta)[:, None])
+    # A @ diag(p_diag) @ B_inv for all atoms
+    A_p_B_inv = (A[None, :, :] * p_diag[:, None, :]) @ B_inv
+    return (np.sqrt(2 * r/np.pi)[:, None, None] * np.real(A_p_B_inv)) @ K_vector
@@ -25,7 +25,9 @@ def cut_cylinder(
     translation_vector = np.array(unit_vector) * [shift_x, shift_y, 0.0]
     box_z = structure.cell[2][2]
 
-    del structure[[atom.index for atom in structure if (atom.position[0]-xcenter)*(atom.position[0]-xcenter)+(atom.position[1]-ycenter)*(atom.position[1]-ycenter) > 90000]]
+    positions = structure.positions
+    is_outside = (positions[:, 0] - xcenter)**2 + (positions[:, 1] - ycenter)**2 > radius*radius
+    del structure[np.flatnonzero(is_outside)]
     structure.translate(translation_vector)
     structure.set_cell([box, box, box_z])
 
@@ -1,5 +1,6 @@
 from pyiron_workflow import as_function_node
 import ase as _ase
+from compact_structure import CompactAtoms as _CompactAtoms
 import numpy as _numpy
 import ipywidgets as _ipywidgets
 from typing import Optional
@@ -7,18 +8,61 @@ from typing import Optional
 @as_function_node()
 def ase_read(fp: str,
              format=None):
-    """Read structure from file using ase"""
+    """Read structure from file using ase, a binary structure directory is opened memory mapped as CompactAtoms"""
+    import os
+    if format == 'binary' or (format is None and os.path.isfile(os.path.join(fp, 'meta.json'))):
+        from structure_io import read_binary_structure
+        structure = read_binary_structure(fp, mode='c').to_compact()
+        return structure
     from ase.io import read
     structure = read(fp, format=format)
     return structure
 
 @as_function_node()
-def swap_atom_types(structure: _ase.Atoms, 
+def swap_atom_types(structure: _ase.Atoms|_CompactAtoms, 
                     old_atom_number: int, 
                     new_atom_number: int):
     """Swap atom type number to another atom type number""" 
     structure = structure.copy()
     structure.numbers[structure.numbers == old_atom_number] = new_atom_number
     return structure
-    
-    
\ No newline at end of file
+
+@as_function_node()
+def ase2compact(atoms: _ase.Atoms,
+                single_precision: bool = False):
+    """Convert ase.Atoms to CompactAtoms, float64 positions are shared with atoms"""
+    import numpy as np
+    compact = _CompactAtoms.from_ase(atoms, dtype=np.float32 if single_precision else np.float64)
+    return compact
+
+@as_function_node()
+def compact2ase(compact: _CompactAtoms):
+    """Convert CompactAtoms to ase.Atoms, float64 positions are shared with compact"""
+    atoms = compact.to_ase()
+    return atoms
+
+@as_function_node()
+def binary_read(path: str,
+                mode: str = 'c'):
+    """Open a binary structure directory as CompactAtoms with memory mapped positions, mode 'c' keeps changes in memory"""
+    from structure_io import read_binary_structure
+    compact = read_binary_structure(path, mode=mode).to_compact()
+    return compact
+
+@as_function_node()
+def binary_write(structure: _ase.Atoms|_CompactAtoms,
+                 path: str):
+    """Write structure to a binary structure directory, returns the path"""
+    from structure_io import write_binary_structure
+    path = write_binary_structure(path, structure)
+    return path
+
+@as_function_node()
+def dump2binary(dump_file: str,
+                path: str,
+                index: int = 0,
+                species: Optional[list] = None):
+    """Convert frame index of a LAMMPS text dump to a binary structure directory, returns the path"""
+    from structure_io import lammps_dump_to_binary
+    path = lammps_dump_to_binary(dump_file, path, index=index, species=species)
+    return path
@@ -5,14 +5,102 @@ from typing import Optional
 def outer_cylinder(
     structure,
     radius: Optional[float|int],
+    n_workers: Optional[int] = 1,
 ):
-    xcenter = structure.cell[0][0]/2
-    ycenter = structure.cell[1][1]/2
+    _tag_radial_regions(structure, radii=[radius], types=[4, 3], n_workers=n_workers)
+
+    return structure
+
+@as_function_node("cylinder_with_regions")
+def tag_radial_regions(
+    structure,
+    radii: list,
+    types: list,
+    group_names: Optional[list] = None,
+    group_file: Optional[str] = None,
+    xcenter: Optional[float|int] = None,
+    ycenter: Optional[float|int] = None,
+    chunk_size: Optional[int] = 2**16,
+    n_workers: Optional[int] = 1,
+):
+    '''
+    Tags the atoms of the structure in place by their distance from the cylinder axis
+    (along z), with any number of cylindrical shells. The squared distance of every
+    atom is computed once and the atom gets the type of the shell it falls into.
+    Works chunk by chunk on the position array, so it also runs on memory mapped
+    positions of 10^8 atoms.
+    If group_file is given, a LAMMPS input file defining one group per shell (by atom
+    id, i.e. index + 1, as written by structure_io) is written, to be read with include.
 
-    is_outside = ((structure.positions[:][:,0]-xcenter)*(structure.positions[:][:,0]-xcenter))+((structure.positions[:][:,1]-ycenter)*(structure.positions[:][:,1]-ycenter)) >= radius*radius
-    is_inside = ((structure.positions[:][:,0]-xcenter)*(structure.positions[:][:,0]-xcenter))+((structure.positions[:][:,1]-ycenter)*(structure.positions[:][:,1]-ycenter)) < radius*radius
 
-    structure.numbers[is_outside] = 3
-    structure.numbers[is_inside] = 4
+        Parameters:
+            structure: ase atoms or CompactAtoms
+            radii: increasing shell radii, atoms with r >= radii[i] are outside shell i
+            types: len(radii) + 1 atom types, from the innermost to the outermost region
+            group_names: len(radii) + 1 LAMMPS group names, e.g. ['free', 'fixed'], None to skip a region
+            group_file: file name of the LAMMPS group definitions
+            xcenter, ycenter: cylinder axis, by default the center of the cell
+            chunk_size: number of atoms processed at once
+            n_workers: number of threads tagging chunks in parallel
+    '''
+    _tag_radial_regions(
+        structure,
+        radii=radii,
+        types=types,
+        xcenter=xcenter,
+        ycenter=ycenter,
+        chunk_size=chunk_size,
+        n_workers=n_workers,
+    )
+    if group_file is not None:
+        _write_lammps_groups(group_file, structure.numbers, types, group_names, chunk_size=chunk_size)
 
     return structure
+
+def _tag_radial_regions(structure, radii, types, xcenter=None, ycenter=None, chunk_size=2**16, n_workers=1):
+    import numpy as np
+    from chunked_execution import for_each_chunk
+
+    if len(types) != len(radii) + 1:
+        raise ValueError("Expected one type more than radii, got", len(types), len(radii))
+    if np.any(np.diff(radii) <= 0):
+        raise ValueError("The radii have to be increasing, got", radii)
+    if xcenter is None:
+        xcenter = structure.cell[0][0]/2
+    if ycenter is None:
+        ycenter = structure.cell[1][1]/2
+    radii_squared = np.asarray(radii, dtype=float)**2
+    types = np.asarray(types)
+    positions = structure.positions
+    numbers = structure.numbers
+
+    def tag_chunk(start, stop):
+        dx = positions[start:stop, 0] - xcenter
+        dy = positions[start:stop, 1] - ycenter
+        numbers[start:stop] = types[np.searchsorted(radii_squared, dx*dx + dy*dy, side='right')]
+
+    for_each_chunk(tag_chunk, len(positions), chunk_size=chunk_size, n_workers=n_workers)
+
+def _write_lammps_groups(file_name, numbers, types, group_names, chunk_size=2**16, ids_per_line=1000):
+    """Write 'group <name> id ...' commands, consecutive ids are merged into ranges i:j"""
+    import numpy as np
+
+    if group_names is None:
+        group_names = [None] * len(types)
+    if len(group_names) != len(types):
+        raise ValueError("Expected one group name per type, got", group_names)
+    with open(file_name, 'w') as f:
+        for name, atom_type in zip(group_names, types):
+            if name is None:
+                continue
+            f.write(f"group {name} empty\n")
+            for start in range(0, len(numbers), chunk_size):
+                ids = np.flatnonzero(numbers[start:start+chunk_size] == atom_type) + start + 1
+                if len(ids) == 0:
+                    continue
+                breaks = np.flatnonzero(np.diff(ids) != 1)
+                first = ids[np.r_[0, breaks + 1]]
+                last = ids[np.r_[breaks, len(ids) - 1]]
+                ranges = [f"{i}" if i == j else f"{i}:{j}" for i, j in zip(first, last)]
+                for i in range(0, len(ranges), ids_per_line):
+                    f.write(f"group {name} id " + " ".join(ranges[i:i+ids_per_line]) + "\n")
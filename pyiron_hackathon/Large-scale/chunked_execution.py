@@ -0,0 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def for_each_chunk(func, n_items, chunk_size=2**16, n_workers=1):
+    """
+    Call func(start, stop) for consecutive chunks of range(n_items).
+
+    With n_workers > 1 the chunks are handled by a thread pool. The threads share
+    the arrays of the calling node and NumPy releases the GIL inside its array
+    operations, so func can read and write its own slice of a shared array
+    without any copies and the chunks are processed in parallel.
+    """
+    bounds = [
+        (start, min(start + chunk_size, n_items))
+        for start in range(0, n_items, chunk_size)
+    ]
+    if n_workers == 1:
+        for start, stop in bounds:
+            func(start, stop)
+    else:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            list(executor.map(lambda b: func(*b), bounds))
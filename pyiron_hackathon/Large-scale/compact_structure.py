@@ -0,0 +1,85 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+@dataclass(eq=False)
+class CompactAtoms:
+    """
+    Lightweight structure container for the large-scale node chain.
+
+    Only the positions (float32 or float64), the atom numbers/types (uint8), the
+    cell and the pbc are stored, 13 bytes per atom with float32 positions instead
+    of the 32+ bytes of ase.Atoms. It provides the subset of the ase.Atoms
+    interface the structure nodes use (positions, numbers, cell, copy, translate,
+    set_cell, len and del), so the nodes accept it natively.
+    """
+
+    positions: np.ndarray
+    numbers: np.ndarray
+    cell: np.ndarray = field(default_factory=lambda: np.zeros((3, 3)))
+    pbc: np.ndarray = field(default_factory=lambda: np.zeros(3, dtype=bool))
+
+    def __post_init__(self):
+        if self.positions.dtype not in (np.float32, np.float64):
+            self.positions = np.asarray(self.positions, dtype=np.float64)
+        self.numbers = np.asarray(self.numbers, dtype=np.uint8)
+        self.cell = np.array(self.cell, dtype=float).reshape(3, 3)
+        self.pbc = np.array(self.pbc, dtype=bool).reshape(3)
+
+    @classmethod
+    def from_ase(cls, atoms, dtype=np.float64):
+        """Positions are shared with atoms for dtype=np.float64, otherwise converted"""
+        return cls(
+            positions=np.asarray(atoms.positions, dtype=dtype),
+            numbers=atoms.numbers,
+            cell=atoms.cell.array,
+            pbc=atoms.pbc,
+        )
+
+    def to_ase(self):
+        """Float64 positions are shared with the returned ase.Atoms, otherwise converted"""
+        from ase import Atoms
+
+        atoms = Atoms(numbers=self.numbers, cell=self.cell, pbc=self.pbc)
+        atoms.arrays["positions"] = np.ascontiguousarray(self.positions, dtype=np.float64)
+        return atoms
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactAtoms):
+            return NotImplemented
+        return all(
+            np.array_equal(getattr(self, key), getattr(other, key))
+            for key in ("positions", "numbers", "cell", "pbc")
+        )
+
+    # defining __eq__ sets __hash__ to None, keep hashing by identity as before
+    __hash__ = object.__hash__
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __delitem__(self, indices):
+        mask = np.ones(len(self), dtype=bool)
+        mask[indices] = False
+        self.positions = self.positions[mask]
+        self.numbers = self.numbers[mask]
+
+    def copy(self):
+        return CompactAtoms(
+            positions=self.positions.copy(),
+            numbers=self.numbers.copy(),
+            cell=self.cell.copy(),
+            pbc=self.pbc.copy(),
+        )
+
+    def get_positions(self):
+        return self.positions.copy()
+
+    def translate(self, displacement):
+        self.positions += np.asarray(displacement, dtype=self.positions.dtype)
+
+    def set_cell(self, cell):
+        """Set the cell without scaling the atoms, a vector of three lengths gives an orthogonal cell"""
+        cell = np.asarray(cell, dtype=float)
+        self.cell = np.diag(cell) if cell.shape == (3,) else cell.reshape(3, 3)
@@ -29,6 +29,38 @@ def create_single_species(
             species: desired element
             x_pbc, y_pbc, z_pbc: periodic boundaries, true or false along the three coordinate axes
     '''
+    return _create_single_species(
+        crystal=crystal,
+        lattice_constant_a=lattice_constant_a,
+        lattice_constant_c=lattice_constant_c,
+        x_indices=x_indices,
+        y_indices=y_indices,
+        z_indices=z_indices,
+        x_repetition=x_repetition,
+        y_repetition=y_repetition,
+        z_repetition=z_repetition,
+        species=species,
+        x_pbc=x_pbc,
+        y_pbc=y_pbc,
+        z_pbc=z_pbc,
+    )
+
+
+def _create_single_species(
+    crystal: Optional[str],
+    lattice_constant_a: Optional[float|int], 
+    lattice_constant_c: Optional[float|int],
+    x_indices: Optional[str|list[int]] = '1 0 0',
+    y_indices: Optional[str|list[int]] = '0 1 0',
+    z_indices: Optional[str|list[int]] = '0 0 1',
+    x_repetition: Optional[int] = 1,
+    y_repetition: Optional[int] = 1,
+    z_repetition: Optional[int] = 1,
+    species: Optional[str] = 'W',
+    x_pbc: Optional[bool] = False,
+    y_pbc: Optional[bool] = False,
+    z_pbc: Optional[bool] = False
+):
     if (crystal == 'bcc'):
         from ase.lattice.cubic import BodyCenteredCubic
         crys_txt = BodyCenteredCubic
@@ -101,6 +133,183 @@ def create_single_species(
     return ase_atoms
 
 
-    
+def _iter_repeated_positions(unit_cell, repetitions, block_size=2**20):
+    """
+    Yield (ids, positions) of the unit_cell repeated repetitions times, in blocks
+    of about block_size atoms, in the atom order of create_single_species.
+    """
+    import numpy as np
+
+    unit_positions = unit_cell.positions
+    n_cells = int(np.prod(repetitions))
+    cells_per_block = max(1, block_size // len(unit_cell))
+    for start in range(0, n_cells, cells_per_block):
+        stop = min(start + cells_per_block, n_cells)
+        shifts = np.column_stack(np.unravel_index(np.arange(start, stop), repetitions, order='F')) @ unit_cell.cell.array
+        positions = (shifts[:, None, :] + unit_positions[None, :, :]).reshape(-1, 3)
+        ids = np.arange(start * len(unit_cell), stop * len(unit_cell)) + 1
+        yield ids, positions
+
+
+@as_function_node("file_name")
+def write_single_species(
+    crystal: Optional[str],
+    lattice_constant_a: Optional[float|int],
+    lattice_constant_c: Optional[float|int],
+    x_indices: Optional[str|list[int]] = '1 0 0',
+    y_indices: Optional[str|list[int]] = '0 1 0',
+    z_indices: Optional[str|list[int]] = '0 0 1',
+    x_repetition: Optional[int] = 1,
+    y_repetition: Optional[int] = 1,
+    z_repetition: Optional[int] = 1,
+    species: Optional[str] = 'W',
+    x_pbc: Optional[bool] = False,
+    y_pbc: Optional[bool] = False,
+    z_pbc: Optional[bool] = False,
+    file_name: Optional[str] = 'structure.data',
+    file_format: Optional[str] = 'lammps-data',
+    block_size: Optional[int] = 2**20,
+):
+    '''
+    Writes the same box as create_single_species directly to a file without ever
+    building the full ase atoms object, returns the file name.
+    Only the oriented unit cell is built with ase, the repetitions are generated
+    and written in blocks of about block_size atoms, so the peak memory does not
+    depend on the size of the box.
+
+
+        Parameters:
+            crystal, lattice_constant_a, lattice_constant_c, x_indices, y_indices, z_indices,
+            x_repetition, y_repetition, z_repetition, species, x_pbc, y_pbc, z_pbc: see create_single_species
+            file_name: output file (lammps-data) or directory (binary)
+            file_format: lammps-data (atom_style atomic) or binary (see structure_io.create_binary_structure)
+            block_size: approximate number of atoms generated and written at once
+    '''
+    import numpy as np
+    from ase.data import atomic_masses, atomic_numbers
+    from structure_io import (
+        create_binary_structure,
+        write_lammps_data_atoms,
+        write_lammps_data_header,
+    )
+
+    unit_cell = _create_single_species(
+        crystal=crystal,
+        lattice_constant_a=lattice_constant_a,
+        lattice_constant_c=lattice_constant_c,
+        x_indices=x_indices,
+        y_indices=y_indices,
+        z_indices=z_indices,
+        species=species,
+        x_pbc=x_pbc,
+        y_pbc=y_pbc,
+        z_pbc=z_pbc,
+    )
+    repetitions = (x_repetition, y_repetition, z_repetition)
+    n_atoms = int(np.prod(repetitions)) * len(unit_cell)
+    cell = unit_cell.cell.array * np.array(repetitions)[:, None]
+
+    def iter_blocks():
+        return _iter_repeated_positions(unit_cell, repetitions, block_size=block_size)
+
+    if file_format == 'lammps-data':
+        with open(file_name, 'w') as f:
+            write_lammps_data_header(f, n_atoms=n_atoms, cell=cell, masses=[atomic_masses[atomic_numbers[species]]])
+            for ids, positions in iter_blocks():
+                write_lammps_data_atoms(f, ids=ids, types=np.ones(len(ids), dtype=int), positions=positions)
+    elif file_format == 'binary':
+        columns = create_binary_structure(file_name, n_atoms=n_atoms, cell=cell, pbc=(x_pbc, y_pbc, z_pbc), species=[species])
+        for ids, positions in iter_blocks():
+            columns['positions'][ids[0]-1:ids[-1]] = positions
+            columns['types'][ids[0]-1:ids[-1]] = 1
+            columns['ids'][ids[0]-1:ids[-1]] = ids
+        for column in columns.values():
+            column.flush()
+    else:
+        raise ValueError("Unknown file_format:", file_format)
+
+    return file_name
+
+
+@as_function_node("cylinder")
+def create_cylinder_single_species(
+    crystal: Optional[str],
+    lattice_constant_a: Optional[float|int],
+    lattice_constant_c: Optional[float|int],
+    xcenter: Optional[float|int],
+    ycenter: Optional[float|int],
+    radius: Optional[float|int],
+    thickness: Optional[float|int],
+    x_indices: Optional[str|list[int]] = '1 0 0',
+    y_indices: Optional[str|list[int]] = '0 1 0',
+    z_indices: Optional[str|list[int]] = '0 0 1',
+    species: Optional[str] = 'W',
+    z_pbc: Optional[bool] = False,
+    single_precision: Optional[bool] = False,
+):
+    '''
+    Returns the same cylinder as create_single_species followed by cut_cylinder, as
+    a CompactAtoms, without building the box first. Only the unit cells intersecting
+    the cylinder are enumerated, row by row, and a single layer of unit cells along z
+    is cut and then stacked, so time and memory scale with the kept atoms.
+    The lattice is not limited to a box, the cylinder may extend to negative
+    coordinates of the lattice, in which case cut_cylinder would have lost atoms.
+
+
+        Parameters:
+            crystal, lattice_constant_a, lattice_constant_c, x_indices, y_indices, z_indices,
+            species: see create_single_species
+            xcenter, ycenter: center of the cylinder in the coordinates of create_single_species
+            radius: cylinder radius
+            thickness: length along z, rounded to a whole number of unit cells (at least one)
+            z_pbc: periodic boundary along z
+            single_precision: store the positions as float32
+    '''
+    import numpy as np
+    from ase.data import atomic_numbers
+    from compact_structure import CompactAtoms
+
+    unit_cell = _create_single_species(
+        crystal=crystal,
+        lattice_constant_a=lattice_constant_a,
+        lattice_constant_c=lattice_constant_c,
+        x_indices=x_indices,
+        y_indices=y_indices,
+        z_indices=z_indices,
+        species=species,
+        z_pbc=z_pbc,
+    )
+    cell = unit_cell.cell.array
+    if not np.allclose(cell, np.diag(np.diag(cell))):
+        raise ValueError("Only orthogonal unit cells are supported, got cell", cell)
+    lx, ly, lz = np.diag(cell)
+    unit_positions = unit_cell.positions
+    # atoms of a cell may sit on its upper faces, widen the cell bounds accordingly
+    x_min, y_min, _ = unit_positions.min(axis=0)
+    x_max, y_max, _ = unit_positions.max(axis=0)
+    z_repetition = max(1, int(round(thickness/lz)))
+
+    # one layer of unit cells along z, rows of cells along x in the order of create_single_species
+    layer = []
+    for iy in range(int(np.floor((ycenter - radius - y_max)/ly)), int(np.ceil((ycenter + radius - y_min)/ly)) + 1):
+        dy = max(0.0, iy*ly + y_min - ycenter, ycenter - iy*ly - y_max)
+        if dy > radius:
+            continue
+        half_width = np.sqrt(radius*radius - dy*dy)
+        ix = np.arange(int(np.floor((xcenter - half_width - x_max)/lx)), int(np.ceil((xcenter + half_width - x_min)/lx)) + 1)
+        positions = (np.column_stack([ix*lx, np.full(len(ix), iy*ly), np.zeros(len(ix))])[:, None, :] + unit_positions[None, :, :]).reshape(-1, 3)
+        layer.append(positions[(positions[:, 0] - xcenter)**2 + (positions[:, 1] - ycenter)**2 <= radius*radius])
+    layer = np.concatenate(layer) if len(layer) > 0 else np.empty((0, 3))
+
+    box = (2*radius) + (radius/4)
+    layer += [box/2 - xcenter, box/2 - ycenter, 0.0]
+    positions = np.empty((z_repetition, len(layer), 3), dtype=np.float32 if single_precision else np.float64)
+    for iz in range(z_repetition):
+        positions[iz] = layer + [0.0, 0.0, iz*lz]
 
-    
+    return CompactAtoms(
+        positions=positions.reshape(-1, 3),
+        numbers=np.full(positions.shape[0]*positions.shape[1], atomic_numbers[species], dtype=np.uint8),
+        cell=np.diag([box, box, z_repetition*lz]),
+        pbc=(False, False, z_pbc),
+    )
@@ -7,16 +7,19 @@ def cut_cylinder(
     xcenter: Optional[float|int],
     ycenter: Optional[float|int],
     radius: Optional[float|int],
+    n_workers: Optional[int] = 1,
 ):
     '''
     Returns a cylindrical structure for k-controlled fracure simulations.
     Assumed that crack front is along z-direction (make sure input structure is appropriate)
     xcenter, ycenter: Desired mathenatical center of crack tip from input structure
     radius: cylinder radius
+    n_workers: number of threads evaluating the distances of chunks of atoms in parallel
 
     '''
 
     import numpy as np
+    from chunked_execution import for_each_chunk
     
     box = (2*radius) + (radius/4)
     shift_x = box/2 - xcenter
@@ -25,8 +28,128 @@ def cut_cylinder(
     translation_vector = np.array(unit_vector) * [shift_x, shift_y, 0.0]
     box_z = structure.cell[2][2]
 
-    del structure[[atom.index for atom in structure if (atom.position[0]-xcenter)*(atom.position[0]-xcenter)+(atom.position[1]-ycenter)*(atom.position[1]-ycenter) > 90000]]
+    positions = structure.positions
+    is_outside = np.empty(len(structure), dtype=bool)
+
+    def mask_chunk(start, stop):
+        is_outside[start:stop] = (positions[start:stop, 0] - xcenter)**2 + (positions[start:stop, 1] - ycenter)**2 > radius*radius
+
+    for_each_chunk(mask_chunk, len(structure), n_workers=n_workers)
+    del structure[np.flatnonzero(is_outside)]
     structure.translate(translation_vector)
     structure.set_cell([box, box, box_z])
 
-    return structure
\ No newline at end of file
+    return structure
+
+@as_function_node("cracked_structure")
+def create_crack_sample(
+    crystal: Optional[str],
+    lattice_constant_a: Optional[float|int],
+    lattice_constant_c: Optional[float|int],
+    xcenter: Optional[float|int],
+    ycenter: Optional[float|int],
+    radius: Optional[float|int],
+    boundary_radius: Optional[float|int],
+    K_I: Optional[int|float],
+    K_II: Optional[int|float],
+    K_III: Optional[int|float],
+    crack_params: Optional[dict],
+    x_indices: Optional[str|list[int]] = '1 0 0',
+    y_indices: Optional[str|list[int]] = '0 1 0',
+    z_indices: Optional[str|list[int]] = '0 0 1',
+    x_repetition: Optional[int] = 1,
+    y_repetition: Optional[int] = 1,
+    z_repetition: Optional[int] = 1,
+    species: Optional[str] = 'W',
+    x_pbc: Optional[bool] = False,
+    y_pbc: Optional[bool] = False,
+    z_pbc: Optional[bool] = False,
+    structure=None,
+    single_precision: Optional[bool] = False,
+    chunk_size: Optional[int] = 2**16,
+    n_workers: Optional[int] = 1,
+):
+    '''
+    Returns the same K-controlled crack sample as the node chain
+    create_single_species -> cut_cylinder -> outer_cylinder -> displace_atoms_crack_aniso
+    as a CompactAtoms, without building any intermediate ase atoms object.
+    The box is generated chunk_size atoms at a time and every chunk is cut to the
+    cylinder right away, so only the kept atoms are ever stored. Tagging of the
+    boundary (type 3) and inner (type 4) atoms and the crack tip displacement are
+    then done in a single pass over the kept position array.
+
+    Copy semantics: the input structure is never modified. Its positions are only
+    read for the cut, which gathers the kept atoms into new arrays; these are the
+    only copy made and are tagged and displaced in place.
+    Use the node chain to inspect the intermediate structures.
+
+
+        Parameters:
+            crystal, lattice_constant_a, lattice_constant_c, x_indices, y_indices, z_indices,
+            x_repetition, y_repetition, z_repetition, species, x_pbc, y_pbc, z_pbc: see create_single_species
+            xcenter, ycenter, radius: see cut_cylinder
+            boundary_radius: radius of outer_cylinder
+            K_I, K_II, K_III, crack_params: see displace_atoms_crack_aniso
+            structure: optional box to start from instead of create_single_species
+            single_precision: store the positions of the sample as float32
+            chunk_size: number of atoms processed at once
+            n_workers: number of threads processing the chunks of the kept atoms in parallel
+    '''
+
+    import numpy as np
+    from chunked_execution import for_each_chunk
+    from compact_structure import CompactAtoms
+    from creator_crystal_structure import _create_single_species, _iter_repeated_positions
+    from K_Griffith import _crack_tip_displacement
+
+    if structure is None:
+        unit_cell = _create_single_species(
+            crystal=crystal,
+            lattice_constant_a=lattice_constant_a,
+            lattice_constant_c=lattice_constant_c,
+            x_indices=x_indices,
+            y_indices=y_indices,
+            z_indices=z_indices,
+            species=species,
+            x_pbc=x_pbc,
+            y_pbc=y_pbc,
+            z_pbc=z_pbc,
+        )
+        repetitions = (x_repetition, y_repetition, z_repetition)
+        blocks = (positions for _, positions in _iter_repeated_positions(unit_cell, repetitions, block_size=chunk_size))
+        box_z = unit_cell.cell[2][2] * z_repetition
+        pbc = (x_pbc, y_pbc, z_pbc)
+    else:
+        positions = structure.positions
+        blocks = (positions[start:start+chunk_size] for start in range(0, len(positions), chunk_size))
+        box_z = structure.cell[2][2]
+        pbc = structure.pbc
+
+    # cut_cylinder
+    dtype = np.float32 if single_precision else np.float64
+    kept = [
+        np.asarray(block[(block[:, 0] - xcenter)**2 + (block[:, 1] - ycenter)**2 <= radius*radius], dtype=dtype)
+        for block in blocks
+    ]
+    positions = np.concatenate(kept) if len(kept) > 0 else np.empty((0, 3), dtype=dtype)
+    del kept
+    box = (2*radius) + (radius/4)
+    positions += np.array([box/2 - xcenter, box/2 - ycenter, 0.0], dtype=dtype)
+    numbers = np.empty(len(positions), dtype=np.uint8)
+
+    # outer_cylinder and displace_atoms_crack_aniso, both centered in the new cell
+    center = box/2
+    A = crack_params['A']
+    B_inv = crack_params['B_inv']
+    p = crack_params['p']
+    K_vector = np.array([K_II, K_I, K_III])
+
+    def process_chunk(start, stop):
+        x1 = positions[start:stop, 0] - center
+        x2 = positions[start:stop, 1] - center
+        numbers[start:stop] = np.where(x1*x1 + x2*x2 >= boundary_radius*boundary_radius, 3, 4)
+        positions[start:stop] += _crack_tip_displacement(x1, x2, A, B_inv, p, K_vector)
+
+    for_each_chunk(process_chunk, len(positions), chunk_size=chunk_size, n_workers=n_workers)
+
+    return CompactAtoms(positions=positions, numbers=numbers, cell=np.diag([box, box, box_z]), pbc=pbc)
@@ -0,0 +1,294 @@
+import json
+import os
+
+import numpy as np
+
+
+def write_lammps_data_header(f, n_atoms, cell, masses):
+    """Write the header of a LAMMPS data file (atom_style atomic) up to the Atoms section"""
+    cell = np.asarray(cell)
+    if not np.allclose(cell, np.diag(np.diag(cell))):
+        raise ValueError("Only orthogonal cells can be written, got cell", cell)
+    f.write("LAMMPS data file\n\n")
+    f.write(f"{n_atoms} atoms\n")
+    f.write(f"{len(masses)} atom types\n\n")
+    for length, axis in zip(np.diag(cell), "xyz"):
+        f.write(f"0.0 {length:.10f} {axis}lo {axis}hi\n")
+    f.write("\nMasses\n\n")
+    for i, mass in enumerate(masses):
+        f.write(f"{i + 1} {mass}\n")
+    f.write("\nAtoms # atomic\n\n")
+
+
+def write_lammps_data_atoms(f, ids, types, positions):
+    """Append one block of atoms to the Atoms section of a LAMMPS data file"""
+    np.savetxt(
+        f,
+        np.column_stack([ids, types, positions]),
+        fmt=["%d", "%d", "%.10f", "%.10f", "%.10f"],
+    )
+
+
+def create_binary_structure(
+    path, n_atoms, cell, pbc, species, positions_dtype=np.float64
+):
+    """
+    Create an empty structure in the columnar binary format and return its columns
+    as writable memory maps, which can then be filled block by block.
+
+    The format is a directory with one .npy file per column, positions (n_atoms, 3),
+    types (n_atoms,) as uint8 LAMMPS types starting at 1 and ids (n_atoms,) starting
+    at 1, and meta.json with the cell, the pbc and the species of every type (or
+    None for bare LAMMPS types).
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(
+            {
+                "n_atoms": int(n_atoms),
+                "cell": np.asarray(cell, dtype=float).tolist(),
+                "pbc": [bool(p) for p in pbc],
+                "species": None if species is None else list(species),
+            },
+            f,
+        )
+    shapes = {
+        "positions": ((n_atoms, 3), positions_dtype),
+        "types": ((n_atoms,), np.uint8),
+        "ids": ((n_atoms,), np.int64),
+    }
+    return {
+        key: np.lib.format.open_memmap(
+            os.path.join(path, key + ".npy"), mode="w+", dtype=dtype, shape=shape
+        )
+        for key, (shape, dtype) in shapes.items()
+    }
+
+
+def write_lammps_dump_header(f, timestep, n_atoms, cell, pbc):
+    """Write the header of one frame of a LAMMPS dump file (id type x y z) up to the atom lines"""
+    cell = np.asarray(cell)
+    if not np.allclose(cell, np.diag(np.diag(cell))):
+        raise ValueError("Only orthogonal cells can be written, got cell", cell)
+    f.write(f"ITEM: TIMESTEP\n{timestep}\n")
+    f.write(f"ITEM: NUMBER OF ATOMS\n{n_atoms}\n")
+    f.write("ITEM: BOX BOUNDS " + " ".join("pp" if p else "ff" for p in pbc) + "\n")
+    for length in np.diag(cell):
+        f.write(f"0.0 {length:.10f}\n")
+    f.write("ITEM: ATOMS id type x y z\n")
+
+
+def write_lammps_dump_atoms(f, ids, types, positions):
+    """Append one block of atom lines to the current frame of a LAMMPS dump file"""
+    write_lammps_data_atoms(f, ids=ids, types=types, positions=positions)
+
+
+class BinaryStructure:
+    """
+    Lazy view of a structure in the columnar binary format of create_binary_structure.
+
+    Only meta.json is read on construction, every column is memory mapped when it
+    is first accessed, so opening a frame of 10^8 atoms is instantaneous and a node
+    only reads the pages of the columns it touches. mode is the mmap_mode of
+    np.load, 'r' (read only), 'r+' (write through to the files) or 'c' (copy on
+    write, changes stay in memory).
+    """
+
+    def __init__(self, path, mode="r"):
+        self.path = path
+        self.mode = mode
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.n_atoms = meta["n_atoms"]
+        self.cell = np.array(meta["cell"])
+        self.pbc = np.array(meta["pbc"])
+        self.species = meta["species"]
+        self._columns = {}
+
+    def _get_column(self, key):
+        if key not in self._columns:
+            self._columns[key] = np.load(
+                os.path.join(self.path, key + ".npy"), mmap_mode=self.mode
+            )
+        return self._columns[key]
+
+    @property
+    def positions(self):
+        return self._get_column("positions")
+
+    @property
+    def types(self):
+        return self._get_column("types")
+
+    @property
+    def ids(self):
+        return self._get_column("ids")
+
+    @property
+    def numbers(self):
+        """Atomic numbers of the species of every type, the types themselves without species"""
+        if self.species is None:
+            return np.array(self.types, dtype=np.uint8)
+        from ase.data import atomic_numbers
+
+        lookup = np.array([0] + [atomic_numbers[s] for s in self.species], dtype=np.uint8)
+        return lookup[self.types]
+
+    def __len__(self):
+        return self.n_atoms
+
+    def to_compact(self):
+        """CompactAtoms with the memory mapped positions, only the atom numbers are loaded"""
+        from compact_structure import CompactAtoms
+
+        return CompactAtoms(
+            positions=self.positions, numbers=self.numbers, cell=self.cell, pbc=self.pbc
+        )
+
+    def to_ase(self):
+        from ase import Atoms
+
+        return Atoms(
+            numbers=self.numbers,
+            positions=self.positions,
+            cell=self.cell,
+            pbc=self.pbc,
+        )
+
+
+def read_binary_structure(path, mode="r"):
+    """Open a structure in the columnar binary format, see BinaryStructure"""
+    return BinaryStructure(path, mode=mode)
+
+
+def write_binary_structure(path, structure, positions_dtype=None, chunk_size=2**20):
+    """
+    Write an ase.Atoms or CompactAtoms to the columnar binary format, chunk by chunk,
+    with one type per chemical species in increasing order of the atomic number.
+    """
+    from ase.data import chemical_symbols
+
+    positions = structure.positions
+    numbers = np.asarray(structure.numbers)
+    unique_numbers = np.unique(numbers)
+    lookup = np.zeros(unique_numbers.max() + 1 if len(unique_numbers) > 0 else 1, dtype=np.uint8)
+    lookup[unique_numbers] = np.arange(1, len(unique_numbers) + 1)
+    columns = create_binary_structure(
+        path,
+        n_atoms=len(positions),
+        cell=np.asarray(structure.cell),
+        pbc=structure.pbc,
+        species=[chemical_symbols[n] for n in unique_numbers],
+        positions_dtype=positions.dtype if positions_dtype is None else positions_dtype,
+    )
+    for start in range(0, len(positions), chunk_size):
+        stop = min(start + chunk_size, len(positions))
+        columns["positions"][start:stop] = positions[start:stop]
+        columns["types"][start:stop] = lookup[numbers[start:stop]]
+        columns["ids"][start:stop] = np.arange(start + 1, stop + 1)
+    for column in columns.values():
+        column.flush()
+    return path
+
+
+def _read_lammps_dump_header(f):
+    """Read the header of the next frame, returns None at the end of the file"""
+    line = f.readline()
+    if line == "":
+        return None
+    if not line.startswith("ITEM: TIMESTEP"):
+        raise ValueError("Expected ITEM: TIMESTEP, got", line)
+    timestep = int(f.readline())
+    f.readline()  # ITEM: NUMBER OF ATOMS
+    n_atoms = int(f.readline())
+    bounds_line = f.readline().split()
+    if len(bounds_line) > 6:
+        raise ValueError("Only orthogonal boxes are supported, got", " ".join(bounds_line))
+    pbc = [b == "pp" for b in bounds_line[3:6]]
+    bounds = np.array([f.readline().split()[:2] for _ in range(3)], dtype=float)
+    columns = f.readline().split()[2:]
+    return timestep, n_atoms, pbc, bounds, columns
+
+
+def lammps_dump_to_binary(
+    dump_file,
+    path,
+    index=0,
+    species=None,
+    positions_dtype=np.float64,
+    sort_by_id=True,
+    block_size=2**20,
+):
+    """
+    Convert frame index of a LAMMPS text dump (orthogonal box) to the columnar
+    binary format without ever holding the frame in memory.
+
+    The atom lines are parsed block_size lines at a time with np.fromstring and
+    written to the memory mapped columns. With sort_by_id every atom is written to
+    row id - 1, which sorts the frame on the fly and requires the ids to be 1..n,
+    otherwise the atoms keep the order of the file. Positions are taken from x/y/z,
+    xu/yu/zu or the scaled xs/ys/zs columns and shifted to a cell origin at 0.
+    species lists the element of every type, without it the types are stored
+    without species.
+    """
+    import itertools
+
+    with open(dump_file) as f:
+        for frame in itertools.count():
+            header = _read_lammps_dump_header(f)
+            if header is None:
+                raise IndexError("Frame", index, "not found in", dump_file)
+            timestep, n_atoms, pbc, bounds, columns = header
+            if frame == index:
+                break
+            for _ in itertools.islice(f, n_atoms):
+                pass
+
+        lo = bounds[:, 0]
+        lengths = bounds[:, 1] - bounds[:, 0]
+        for names, scaled in (("x y z", False), ("xu yu zu", False), ("xs ys zs", True), ("xsu ysu zsu", True)):
+            if all(name in columns for name in names.split()):
+                position_columns = [columns.index(name) for name in names.split()]
+                break
+        else:
+            raise ValueError("No position columns in", columns)
+        id_column = columns.index("id")
+        type_column = columns.index("type")
+
+        out = create_binary_structure(
+            path,
+            n_atoms=n_atoms,
+            cell=np.diag(lengths),
+            pbc=pbc,
+            species=species,
+            positions_dtype=positions_dtype,
+        )
+        if sort_by_id:
+            is_written = np.zeros(n_atoms, dtype=bool)
+        start = 0
+        while start < n_atoms:
+            lines = list(itertools.islice(f, min(block_size, n_atoms - start)))
+            if len(lines) == 0:
+                raise ValueError("Frame", index, "of", dump_file, "ends after", start, "of", n_atoms, "atoms")
+            block = np.fromstring("".join(lines), sep=" ").reshape(len(lines), len(columns))
+            ids = block[:, id_column].astype(np.int64)
+            positions = block[:, position_columns]
+            positions = positions * lengths if scaled else positions - lo
+            types = block[:, type_column]
+            if types.max() > 255:
+                raise ValueError("Only 255 atom types fit into the uint8 types column")
+            if sort_by_id:
+                if ids.min() < 1 or ids.max() > n_atoms or is_written[ids - 1].any():
+                    raise ValueError("sort_by_id requires the ids 1 to", n_atoms, "use sort_by_id=False")
+                is_written[ids - 1] = True
+                rows = ids - 1
+            else:
+                rows = slice(start, start + len(lines))
+            out["ids"][rows] = ids
+            out["positions"][rows] = positions
+            out["types"][rows] = types
+            start += len(lines)
+
+    for column in out.values():
+        column.flush()
+    return path
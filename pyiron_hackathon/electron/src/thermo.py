@@ -1,13 +1,20 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
 import numpy as np
-from scipy.special import entr
+from scipy.special import entr, expit
 from scipy.constants import Boltzmann, eV
 
 kB = Boltzmann / eV
 
+CHUNK_SIZE = 2**20
+
 
 def fermi_distribution(energy, temperature, fermi_energy):
     if temperature > 0:
-        return 1 / (1 + np.exp(((energy - fermi_energy) / kB / temperature)))
+        return expit((fermi_energy - energy) / kB / temperature)
     else:
         return 1 * (energy <= fermi_energy)
 
@@ -24,7 +31,77 @@ def get_fermi_energy(E, D, T, N, n_steps=30):
     return mu
 
 
-def get_eigenvalues(job):
+def iter_occupations(E, D, T, mu, chunk_size=CHUNK_SIZE, dtype=np.float64):
+    """
+    Iterate over blocks of k-points of the (k-point, band) eigenvalue matrix E
+    and yield (D, E - mu, f, 1 - f) for every temperature in T at once, each of
+    shape (n_T, n_kpoints_in_block, n_bands). The occupations are evaluated via
+    expit, so they never overflow, and a block holds at most chunk_size
+    (temperature, eigenvalue) pairs, so peak memory does not grow with the
+    k-point mesh. dtype=np.float32 halves the memory of every block.
+    """
+    T = np.asarray(T, dtype=dtype).reshape(-1, 1, 1)
+    mu = np.asarray(mu, dtype=dtype).reshape(-1, 1, 1)
+    n_rows = max(1, chunk_size // (T.size * E.shape[-1]))
+    beta = np.divide(1, kB * T, out=np.zeros_like(T), where=T > 0)
+    for start in range(0, len(E), n_rows):
+        E_chunk = np.asarray(E[start : start + n_rows], dtype=dtype)
+        dE = E_chunk - mu
+        x = dE * beta
+        f = np.where(T > 0, expit(-x), dE <= 0).astype(dtype, copy=False)
+        f_c = np.where(T > 0, expit(x), dE > 0).astype(dtype, copy=False)
+        D_chunk = np.asarray(D[start : start + n_rows], dtype=dtype)[:, None]
+        yield D_chunk, dE, f, f_c
+
+
+def get_fermi_energies(
+    E, D, T, N, tol=1e-8, max_iter=100, chunk_size=CHUNK_SIZE, dtype=np.float64
+):
+    """
+    Fermi energies for an array of temperatures T, solved simultaneously by a
+    bracketed Newton iteration (bisection where Newton leaves the bracket,
+    e.g. at T=0) until the electron count or the bracket is within tol.
+    """
+    T = np.asarray(T, dtype=float)
+    shape = T.shape
+    T = T.ravel()
+    mu_low = np.full(T.shape, E.min() - 1.0)
+    mu_high = np.full(T.shape, E.max() + 1.0)
+    mu = 0.5 * (mu_low + mu_high)
+    active = np.ones(T.shape, dtype=bool)
+    for _ in range(max_iter):
+        dN = np.full(np.sum(active), -float(N))
+        dN_dmu = np.zeros(np.sum(active))
+        for D_chunk, _, f, f_c in iter_occupations(
+            E, D, T[active], mu[active], chunk_size=chunk_size, dtype=dtype
+        ):
+            dN += np.sum(f * D_chunk, axis=(1, 2), dtype=float)
+            dN_dmu += np.sum(f * f_c * D_chunk, axis=(1, 2), dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dN_dmu /= kB * T[active]
+        too_many = dN > 0
+        mu_high[active] = np.where(too_many, mu[active], mu_high[active])
+        mu_low[active] = np.where(too_many, mu_low[active], mu[active])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mu_newton = mu[active] - dN / dN_dmu
+        in_bracket = (
+            np.isfinite(mu_newton)
+            & (mu_newton >= mu_low[active])
+            & (mu_newton <= mu_high[active])
+        )
+        converged = (np.abs(dN) < tol) | (mu_high[active] - mu_low[active] < tol)
+        mu[active] = np.where(
+            converged,
+            mu[active],
+            np.where(in_bracket, mu_newton, 0.5 * (mu_low[active] + mu_high[active])),
+        )
+        active[np.flatnonzero(active)[converged]] = False
+        if not active.any():
+            break
+    return mu.reshape(shape)[()]
+
+
+def _read_eigenvalues(job):
     eigenvals = job.content["output/generic/dft/bands/eig_matrix"]
     weights = job.content["output/electronic_structure/k_weights"]
     weights *= 3 - eigenvals.shape[0]
@@ -34,6 +111,41 @@ def get_eigenvalues(job):
     }
 
 
+def _get_checksum(file_name):
+    stat = os.stat(file_name)
+    key = f"{os.path.abspath(file_name)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def get_eigenvalues(job, cache_directory=None):
+    """
+    Eigenvalues and k-point weights of a DFT job. With a cache_directory they
+    are stored once per job id and HDF5 file checksum (path, size and
+    modification time) as .npy files and afterwards opened memory-mapped, so
+    repeated analyses neither touch the HDF5 file nor copy the arrays.
+    """
+    if cache_directory is None:
+        return _read_eigenvalues(job)
+    path = os.path.join(
+        cache_directory,
+        f"{job.job_id}_{_get_checksum(job.project_hdf5.file_name)}",
+    )
+    if not os.path.exists(path):
+        os.makedirs(cache_directory, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=cache_directory)
+        for key, value in _read_eigenvalues(job).items():
+            np.save(os.path.join(tmp_path, key + ".npy"), value)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:  # written concurrently by another process
+            shutil.rmtree(tmp_path)
+    # opening the memory maps is cheap, so they are not kept between calls
+    return {
+        key: np.load(os.path.join(path, key + ".npy"), mmap_mode="r")
+        for key in ["density", "energy"]
+    }
+
+
 def get_s(f):
     return entr(f) + entr(1 - f)
 
@@ -49,3 +161,86 @@ def get_U(E, D, T, N=12):
     f = fermi_distribution(E, T, fermi_energy)
     fermi_energy_0 = get_fermi_energy(E, D, 0, N)
     return np.sum(D[:, None] * (f - (E < fermi_energy_0)) * (E - fermi_energy))
+
+
+def get_binned_dos(E, D, bin_width=1e-3, chunk_size=CHUNK_SIZE):
+    """
+    Compress the (k-point, band) eigenvalues E and k-point weights D into a
+    histogram with bins of bin_width eV. The result has the same layout as
+    get_eigenvalues (one "band" per non-empty bin), so it can be passed to all
+    functions of this module, and every eigenvalue is moved by at most
+    bin_width / 2 (reported as "max_shift").
+    """
+    E_min = E.min()
+    n_bins = int((E.max() - E_min) // bin_width) + 1
+    density = np.zeros(n_bins)
+    n_rows = max(1, chunk_size // E.shape[-1])
+    for start in range(0, len(E), n_rows):
+        E_chunk = np.asarray(E[start : start + n_rows])
+        density += np.bincount(
+            ((E_chunk - E_min) // bin_width).astype(int).ravel(),
+            weights=np.broadcast_to(
+                np.asarray(D[start : start + n_rows])[:, None], E_chunk.shape
+            ).ravel(),
+            minlength=n_bins,
+        )
+    occupied = np.flatnonzero(density)
+    return {
+        "density": density[occupied],
+        "energy": (E_min + (occupied + 0.5) * bin_width)[:, None],
+        "max_shift": bin_width / 2,
+    }
+
+
+def get_thermodynamics(
+    E, D, T, N=12, gamma=1, bin_width=None, chunk_size=CHUNK_SIZE, dtype=np.float64
+):
+    """
+    Electronic S, U, F = U - TS and heat capacity Cv for a temperature grid T,
+    sharing a single Fermi level solve and one occupation evaluation per
+    temperature. The T=0 reference Fermi level is computed once for the grid.
+
+    With a bin_width (eV) the eigenvalues are first binned by get_binned_dos,
+    so the sums run over the bins instead of all (k-point, band) pairs. Since
+    dF/dE_i = D_i f_i, both F(T) and the T=0 reference shift by at most
+    N * bin_width / 2, so the returned "F_error" = N * bin_width bounds the
+    discretization error of F.
+    """
+    if bin_width is not None:
+        dos = get_binned_dos(E, D, bin_width=bin_width, chunk_size=chunk_size)
+        result = get_thermodynamics(
+            dos["energy"],
+            dos["density"],
+            T,
+            N=N,
+            gamma=gamma,
+            chunk_size=chunk_size,
+            dtype=dtype,
+        )
+        result["F_error"] = 2 * N * dos["max_shift"]
+        return result
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    kwargs = {"chunk_size": chunk_size, "dtype": dtype}
+    fermi_energies = get_fermi_energies(E, D, T, N, **kwargs)
+    fermi_energy_0 = get_fermi_energies(E, D, 0, N, **kwargs)
+    S, U, Cv = np.zeros((3, len(T)))
+    for i, (temperature, fermi_energy) in enumerate(zip(T, fermi_energies)):
+        s = g = gx = gx2 = 0
+        for D_chunk, dE, f, f_c in iter_occupations(
+            E, D, temperature, fermi_energy, **kwargs
+        ):
+            f_0 = dE + fermi_energy < fermi_energy_0
+            s += np.sum((entr(f) + entr(f_c)) * D_chunk, dtype=float)
+            U[i] += np.sum(D_chunk * (f - f_0) * dE, dtype=float)
+            w = D_chunk * f * f_c
+            g += np.sum(w, dtype=float)
+            gx += np.sum(w * dE, dtype=float)
+            gx2 += np.sum(w * dE**2, dtype=float)
+        S[i] = gamma * kB * s
+        # without any partially occupied states (g == 0, e.g. a gapped spectrum at
+        # low T) gx and gx2 vanish as well and Cv stays 0
+        if temperature > 0 and g > 0:
+            # dU/dT at fixed N, including the temperature dependence of mu
+            dmu_dT = -gx / g / temperature
+            Cv[i] = (gx2 / temperature + dmu_dT * gx) / (kB * temperature)
+    return {"T": T, "S": S, "U": U, "F": U - T * S, "Cv": Cv}
@@ -1,9 +1,12 @@
+from concurrent.futures import Future, as_completed
+from threading import Lock, Thread
+
 from scipy.constants import Boltzmann, eV
 
 kB = Boltzmann / eV
 
 
-def run_job(pr, name, structure, T):
+def _create_job(pr, name, structure, T):
     j = pr.create.job.Vasp([name, "T", T])
     if not j.status.initialized:
         return j
@@ -17,18 +20,103 @@ def run_job(pr, name, structure, T):
     j.server.queue = "s_cmmg"
     j.server.cores = 32
     j.server.run_time = 10 * 60
-    j.run()
     return j
 
 
-def get_dataframe(pr):
-    tab = pr.create.table("Table", delete_existing_job=True)
+def run_job(pr, name, structure, T):
+    j = _create_job(pr, name, structure, T)
+    if j.status.initialized:
+        j.run()
+    return j
+
+
+# the pyiron database layer is not documented as thread-safe, so the database
+# writes of creating and saving a job are serialized within a process, the
+# queue submission and the waiting run concurrently
+_database_lock = Lock()
+
+
+def _run_and_wait(project_path, name, structure, T, poll_interval, max_iterations):
+    from pyiron import Project
+
+    pr = Project(project_path)
+    with _database_lock:
+        j = _create_job(pr, name, structure, T)
+        if j.status.initialized:
+            j.save()
+    if j.status.created:
+        j.run()
+    pr.wait_for_job(j, interval_in_s=poll_interval, max_iterations=max_iterations)
+    return j
+
+
+def _submit_to_daemon_thread(func, *args):
+    # unlike ThreadPoolExecutor workers, daemon threads are not joined at
+    # interpreter exit, so a script does not hang on the waiting jobs
+    future = Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    Thread(target=target, daemon=True).start()
+    return future
+
+
+def submit_jobs(
+    pr,
+    name,
+    structure,
+    temperatures,
+    executor=None,
+    poll_interval=10,
+    max_iterations=10000,
+):
+    """
+    Submit one job per temperature concurrently and return a dict mapping each
+    temperature to a future, which resolves to the job once it is finished.
+
+    Every task opens the project from its path itself, so any
+    concurrent.futures.Executor can be passed as executor, including process
+    based ones such as executorlib. By default every temperature is handled by
+    its own daemon thread, which does not keep the interpreter alive at exit.
+    """
+    if executor is None:
+        submit = _submit_to_daemon_thread
+    else:
+        submit = executor.submit
+    return {
+        T: submit(
+            _run_and_wait, pr.path, name, structure, T, poll_interval, max_iterations
+        )
+        for T in temperatures
+    }
+
+
+def iter_dataframes(pr, futures):
+    """Yield the updated dataframe every time one of the submitted jobs finishes"""
+    for future in as_completed(futures.values()):
+        future.result()
+        yield get_dataframe(pr, incremental=True)
+
+
+def get_dataframe(pr, incremental=False):
+    # with incremental=True the existing table is reused and update_table only
+    # parses jobs which are not yet part of it
+    tab = pr.create.table("Table", delete_existing_job=not incremental)
     tab.add["F"] = lambda j: j.content["output/generic/dft/energy_free"][-1]
     tab.add["E0"] = lambda j: j.content["output/generic/dft/energy_zero"][-1]
     tab.add["U"] = lambda j: j.content["output/generic/dft/energy_int"][-1]
     tab.add.get_total_number_of_atoms
     tab.add.get_sigma
-    tab.run()
+    if tab.status.initialized:
+        tab.run()
+    else:
+        tab.update_table()
     df = tab.get_dataframe()
     df["f"] = df.F / df.Number_of_atoms
     df["e0"] = df.E0 / df.Number_of_atoms
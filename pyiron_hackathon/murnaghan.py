@@ -1,26 +1,618 @@
+import atexit
+
 from pyiron_workflow import Workflow
 from atomistics.calculators.wrapper import as_task_dict_evaluator
 
 
-@as_task_dict_evaluator
-def evaluate_with_lammps(structure, tasks, potential_dataframe):
-    import os
-    import shutil
+def _evaluate_with_lammps(structure, tasks, potential_dataframe):
+    import tempfile
     from pyiron_atomistics.lammps.lammps import lammps_function
-    results = {}
-    path_lmp_calculation = os.path.abspath("lmp_working_directory")
-    if os.path.exists(path_lmp_calculation):
-        shutil.rmtree(path_lmp_calculation)
     if "calc_energy" in tasks:
-        shell_output, parsed_output, job_crashed = lammps_function(
-            working_directory=path_lmp_calculation,
-            structure=structure,
-            potential=potential_dataframe,
-        )
+        # every call gets its own working directory, so calls can run in parallel
+        with tempfile.TemporaryDirectory(prefix="lmp_") as path_lmp_calculation:
+            shell_output, parsed_output, job_crashed = lammps_function(
+                working_directory=path_lmp_calculation,
+                structure=structure,
+                potential=potential_dataframe,
+            )
         return {"energy": parsed_output["generic"]["energy_tot"][-1]}
     else:
         raise ValueError("The LAMMPS calculator does not implement:", tasks)
-    return results
+
+
+evaluate_with_lammps = as_task_dict_evaluator(_evaluate_with_lammps)
+
+
+def evaluate_with_lammps_parallel(
+    task_dict, potential_dataframe, max_workers=None, executor=None
+):
+    """
+    Parallel version of evaluate_with_lammps for {"calc_energy": {label: structure}}
+    task dictionaries, the structures are distributed over a process pool with at
+    most max_workers processes (default: number of cores, never more than
+    structures) and the results are collected in the order of the task
+    dictionary. An existing executor can be passed instead, it is not shut down.
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    if list(task_dict.keys()) != ["calc_energy"]:
+        raise ValueError("The LAMMPS calculator does not implement:", list(task_dict))
+    if len(task_dict["calc_energy"]) == 0:
+        return {"energy": {}}
+    if executor is None:
+        max_workers = min(max_workers or os.cpu_count(), len(task_dict["calc_energy"]))
+        with ProcessPoolExecutor(max_workers=max_workers) as exe:
+            return evaluate_with_lammps_parallel(
+                task_dict=task_dict,
+                potential_dataframe=potential_dataframe,
+                executor=exe,
+            )
+    future_dict = {
+        label: executor.submit(
+            _evaluate_with_lammps, structure, ["calc_energy"], potential_dataframe
+        )
+        for label, structure in task_dict["calc_energy"].items()
+    }
+    return {
+        "energy": {
+            label: future.result()["energy"] for label, future in future_dict.items()
+        }
+    }
+
+
+class LammpsSession:
+    """
+    LAMMPS library instance which stays alive between energy evaluations. The
+    potential is read once, as long as the number of atoms, the species and the
+    periodic boundary conditions do not change only the cell and the positions
+    are updated in memory, so no input files are written and no output is parsed.
+    """
+
+    def __init__(self, potential_dataframe, working_directory=None):
+        import os
+        import tempfile
+        from pylammpsmpi import LammpsASELibrary
+        from pyiron_atomistics.lammps.potential import (
+            LammpsPotential,
+            LammpsPotentialFile,
+        )
+        if isinstance(potential_dataframe, str):
+            potential_dataframe = LammpsPotentialFile().find_by_name(
+                potential_dataframe
+            )
+        if working_directory is None:
+            self._tmp_directory = tempfile.TemporaryDirectory(prefix="lmp_session_")
+            working_directory = self._tmp_directory.name
+        else:
+            self._tmp_directory = None
+        potential = LammpsPotential()
+        potential.df = potential_dataframe
+        potential.copy_pot_files(working_directory)
+        # refer to the copied potential files by absolute path, as the LAMMPS
+        # library runs in the working directory of the python process
+        file_dict = {
+            os.path.basename(f): os.path.abspath(
+                os.path.join(working_directory, os.path.basename(f))
+            )
+            for f in potential_dataframe["Filename"].iloc[0]
+        }
+        self._config = [
+            " ".join(file_dict.get(w, w) for w in line.split())
+            for line in potential_dataframe["Config"].iloc[0]
+        ]
+        self._species = potential_dataframe["Species"].iloc[0]
+        self._lmp = LammpsASELibrary(working_directory=working_directory)
+        self._structure = None
+
+    def _is_compatible(self, structure):
+        return (
+            self._structure is not None
+            and len(self._structure) == len(structure)
+            and self._structure.get_chemical_symbols()
+            == structure.get_chemical_symbols()
+            and all(self._structure.pbc == structure.pbc)
+        )
+
+    def get_energy(self, structure):
+        if self._is_compatible(structure):
+            self._lmp.interactive_cells_setter(structure.cell.array)
+            self._lmp.interactive_positions_setter(structure.positions)
+        else:
+            if self._structure is not None:
+                self._lmp.interactive_lib_command("clear")
+            self._lmp.interactive_structure_setter(
+                structure=structure,
+                units="metal",
+                dimension=3,
+                boundary=" ".join(["p" if coord else "f" for coord in structure.pbc]),
+                atom_style="atomic",
+                el_eam_lst=self._species,
+                calc_md=False,
+            )
+            for line in self._config:
+                self._lmp.interactive_lib_command(line)
+            self._structure = structure.copy()
+        self._lmp.interactive_lib_command("run 0")
+        return self._lmp.interactive_energy_pot_getter()
+
+    def close(self):
+        self._lmp.close()
+        if self._tmp_directory is not None:
+            self._tmp_directory.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_lammps_sessions = {}
+
+
+def get_lammps_session(potential_dataframe):
+    """Return the LammpsSession of a potential, it is created on the first call"""
+    if isinstance(potential_dataframe, str):
+        from pyiron_atomistics.lammps.potential import LammpsPotentialFile
+        potential_dataframe = LammpsPotentialFile().find_by_name(potential_dataframe)
+    # potential names and dataframes of the same potential share one session
+    key = tuple(potential_dataframe["Config"].iloc[0])
+    if key not in _lammps_sessions:
+        _lammps_sessions[key] = LammpsSession(potential_dataframe=potential_dataframe)
+    return _lammps_sessions[key]
+
+
+def close_lammps_sessions():
+    """Close all sessions of get_lammps_session, also called at interpreter exit"""
+    while len(_lammps_sessions) > 0:
+        _, session = _lammps_sessions.popitem()
+        session.close()
+
+
+atexit.register(close_lammps_sessions)
+
+
+@as_task_dict_evaluator
+def evaluate_with_lammps_session(structure, tasks, potential_dataframe):
+    if "calc_energy" in tasks:
+        return {
+            "energy": get_lammps_session(potential_dataframe).get_energy(structure)
+        }
+    else:
+        raise ValueError("The LAMMPS calculator does not implement:", tasks)
+
+
+class LammpsResultCache:
+    """
+    On-disk cache of LAMMPS results, one json file per content hash of the
+    structure (cell, positions, species, pbc), the potential and the task. The
+    cache holds at most max_entries results, the least recently used ones are
+    evicted first (the file modification time is updated on every hit).
+    """
+
+    def __init__(self, directory, max_entries=10000):
+        import os
+        self.directory = os.path.abspath(directory)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def get_key(structure, potential_dataframe, task):
+        import hashlib
+        import numpy as np
+        if isinstance(potential_dataframe, str):
+            from pyiron_atomistics.lammps.potential import LammpsPotentialFile
+            potential_dataframe = LammpsPotentialFile().find_by_name(potential_dataframe)
+        # key on the Config lines, so a potential name and its dataframe share entries
+        potential = "".join(potential_dataframe["Config"].iloc[0])
+        h = hashlib.sha256()
+        for value in [
+            np.round(np.asarray(structure.cell), 10) + 0.0,
+            np.round(structure.positions, 10) + 0.0,
+            np.asarray(structure.pbc, dtype=bool),
+        ]:
+            h.update(np.ascontiguousarray(value).tobytes())
+        for value in [" ".join(structure.get_chemical_symbols()), potential, task]:
+            h.update(value.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    @property
+    def stats(self):
+        import os
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(
+                [f for f in os.listdir(self.directory) if f.endswith(".json")]
+            ),
+        }
+
+    def get(self, key):
+        import json
+        import os
+        file_name = os.path.join(self.directory, key + ".json")
+        try:
+            with open(file_name) as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        os.utime(file_name)
+        self.hits += 1
+        return result
+
+    def set(self, key, result, evict=True):
+        import json
+        import os
+        import tempfile
+        fd, tmp_file = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp_file, os.path.join(self.directory, key + ".json"))
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries beyond max_entries"""
+        import os
+        entries = [
+            e for e in os.scandir(self.directory) if e.name.endswith(".json")
+        ]
+        if len(entries) > self.max_entries:
+            entries.sort(key=lambda e: e.stat().st_mtime_ns)
+            for e in entries[: len(entries) - self.max_entries]:
+                try:
+                    os.remove(e.path)
+                except FileNotFoundError:
+                    pass
+
+
+_lammps_result_caches = {}
+
+
+def get_lammps_result_cache(directory, max_entries=10000):
+    """
+    Return the LammpsResultCache of a directory, one instance per directory and
+    process, so its hit and miss counters (cache.stats) add up over all calls.
+    """
+    import os
+    key = os.path.abspath(directory)
+    if key not in _lammps_result_caches:
+        _lammps_result_caches[key] = LammpsResultCache(
+            directory=directory, max_entries=max_entries
+        )
+    return _lammps_result_caches[key]
+
+
+def evaluate_with_lammps_cached(
+    task_dict, potential_dataframe, cache, max_workers=None, executor=None
+):
+    """
+    evaluate_with_lammps_parallel with a LammpsResultCache in front, only the
+    structures which are not in the cache are evaluated with LAMMPS. The cache
+    is trimmed to its max_entries once per call.
+    """
+    if list(task_dict.keys()) != ["calc_energy"]:
+        raise ValueError("The LAMMPS calculator does not implement:", list(task_dict))
+    if isinstance(potential_dataframe, str):
+        from pyiron_atomistics.lammps.potential import LammpsPotentialFile
+        potential_dataframe = LammpsPotentialFile().find_by_name(potential_dataframe)
+    key_dict = {
+        label: cache.get_key(structure, potential_dataframe, "calc_energy")
+        for label, structure in task_dict["calc_energy"].items()
+    }
+    energy_dict = {label: cache.get(key) for label, key in key_dict.items()}
+    missing_dict = {
+        label: task_dict["calc_energy"][label]
+        for label, energy in energy_dict.items()
+        if energy is None
+    }
+    if len(missing_dict) > 0:
+        result_dict = evaluate_with_lammps_parallel(
+            task_dict={"calc_energy": missing_dict},
+            potential_dataframe=potential_dataframe,
+            max_workers=max_workers,
+            executor=executor,
+        )
+        for label, energy in result_dict["energy"].items():
+            energy_dict[label] = float(energy)
+            cache.set(key_dict[label], energy_dict[label], evict=False)
+        cache.evict()
+    return {"energy": energy_dict}
+
+
+def _get_strained_structure(structure, volume_factor):
+    strained = structure.copy()
+    strained.set_cell(structure.cell * volume_factor ** (1 / 3), scale_atoms=True)
+    return strained
+
+
+def _get_equilibrium(volumes, energies, fit_order):
+    import numpy as np
+    poly = np.poly1d(np.polyfit(volumes, energies, fit_order))
+    v_eq = [
+        v.real
+        for v in poly.deriv().roots
+        if abs(v.imag) < 1e-10 and min(volumes) <= v.real <= max(volumes)
+        and poly.deriv(2)(v.real) > 0
+    ]
+    if len(v_eq) == 0:
+        v_eq = [volumes[np.argmin(energies)]]
+    return v_eq[0], v_eq[0] * poly.deriv(2)(v_eq[0])
+
+
+def adaptive_energy_volume_sampling(
+    structure,
+    vol_range,
+    evaluate,
+    fit_order=3,
+    num_initial_points=5,
+    max_points=21,
+    tolerance=1e-3,
+):
+    """
+    Sample the energy volume curve adaptively instead of on a fixed grid.
+
+    Starting from num_initial_points equidistant volumes in [1 - vol_range,
+    1 + vol_range] times the volume of structure, the next volume is placed
+    where the leave-one-out spread of the polynomial fits is largest, weighted
+    towards the current equilibrium volume and away from sampled volumes. The
+    sampling stops when the relative change of the equilibrium volume and the
+    bulk modulus is below tolerance or max_points energies were calculated.
+
+        Parameters:
+            structure: equilibrium guess
+            vol_range: relative volume range
+            evaluate: function mapping a {"calc_energy": structure_dict} task
+                dictionary to {"energy": energy_dict}
+            fit_order: order of the polynomial fit
+
+        Returns:
+            structure_dict, output_dict: in the format of generate_structures
+                and evaluate_with_lammps_wf, sorted by volume
+    """
+    import numpy as np
+    v0 = structure.get_volume()
+    factor_lst = list(np.linspace(1 - vol_range, 1 + vol_range, num_initial_points))
+    energy_lst = list(
+        evaluate(
+            {
+                "calc_energy": {
+                    i: _get_strained_structure(structure, f)
+                    for i, f in enumerate(factor_lst)
+                }
+            }
+        )["energy"].values()
+    )
+    candidates = np.linspace(1 - vol_range, 1 + vol_range, 201)
+    previous = None
+    while len(factor_lst) < max_points:
+        factors, energies = np.array(factor_lst), np.array(energy_lst)
+        current = np.array(_get_equilibrium(factors * v0, energies, fit_order))
+        if previous is not None and np.all(
+            np.abs(current - previous) <= tolerance * np.abs(previous)
+        ):
+            break
+        previous = current
+        loo_predictions = np.array(
+            [
+                np.polyval(
+                    np.polyfit(
+                        np.delete(factors, i), np.delete(energies, i), fit_order
+                    ),
+                    candidates,
+                )
+                for i in range(len(factors))
+            ]
+        )
+        weight = np.exp(-(((candidates - current[0] / v0) / vol_range) ** 2))
+        distance = np.abs(candidates[:, None] - factors[None, :]).min(axis=1)
+        score = loo_predictions.std(axis=0) * weight * distance
+        factor = candidates[np.argmax(score)]
+        factor_lst.append(factor)
+        energy_lst.append(
+            evaluate({"calc_energy": {0: _get_strained_structure(structure, factor)}})[
+                "energy"
+            ][0]
+        )
+    order = np.argsort(factor_lst)
+    structure_dict = {
+        round(float(factor_lst[i]), 7): _get_strained_structure(
+            structure, factor_lst[i]
+        )
+        for i in order
+    }
+    output_dict = {
+        "energy": {
+            key: energy_lst[i] for key, i in zip(structure_dict.keys(), order)
+        }
+    }
+    return structure_dict, output_dict
+
+
+def _polyval_batch(coeff, x):
+    import numpy as np
+    result = np.zeros(np.broadcast_shapes(coeff.shape[:-1], x.shape), dtype=x.dtype)
+    for i in range(coeff.shape[-1]):
+        result = result * x + coeff[..., i]
+    return result
+
+
+def _polyder_batch(coeff):
+    import numpy as np
+    order = coeff.shape[-1] - 1
+    return coeff[..., :-1] * np.arange(order, 0, -1)
+
+
+def _fit_polynomial_eos(volumes, energies, fit_order, transform):
+    """
+    Fit E = P(x) with x = g(V) for a stack of curves by batched least squares
+    and return V_eq, E_eq and the derivatives d2E/dV2 and d3E/dV3 at V_eq.
+    """
+    import numpy as np
+    # x, dx/dV, d2x/dV2 and d3x/dV3 of the variable transformation
+    if transform == "polynomial":
+        v_mean = volumes.mean(axis=-1, keepdims=True)
+        x = volumes / v_mean - 1
+
+        def derivatives(v):
+            one = np.ones_like(v)
+            return v / v_mean[:, 0] - 1, one / v_mean[:, 0], 0 * v, 0 * v
+
+    else:  # birchmurnaghan: E is a polynomial in V^(-2/3)
+        x = volumes ** (-2 / 3)
+
+        def derivatives(v):
+            return (
+                v ** (-2 / 3),
+                -2 / 3 * v ** (-5 / 3),
+                10 / 9 * v ** (-8 / 3),
+                -80 / 27 * v ** (-11 / 3),
+            )
+
+    vander = x[..., None] ** np.arange(fit_order, -1, -1)
+    coeff = np.einsum(
+        "nij,nj->ni", np.linalg.pinv(vander), energies
+    )  # highest order first, as np.polyfit
+    d1 = _polyder_batch(coeff)
+    d2 = _polyder_batch(d1)
+    d3 = _polyder_batch(d2)
+    # roots of dP/dx from the eigenvalues of the stacked companion matrices
+    companion = np.zeros(d1.shape[:-1] + (fit_order - 1, fit_order - 1))
+    companion[:, 0, :] = -d1[:, 1:] / d1[:, :1]
+    companion[:, np.arange(1, fit_order - 1), np.arange(fit_order - 2)] = 1
+    roots = np.linalg.eigvals(companion)
+    x_roots = roots.real
+    valid = (
+        (np.abs(roots.imag) < 1e-8 * np.abs(roots).max(axis=-1, keepdims=True) + 1e-12)
+        & (x_roots >= x.min(axis=-1, keepdims=True))
+        & (x_roots <= x.max(axis=-1, keepdims=True))
+    )
+    x_min = np.take_along_axis(x, energies.argmin(axis=-1)[:, None], axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        v_roots = (
+            (x_roots + 1) * v_mean if transform == "polynomial" else x_roots ** (-3 / 2)
+        )
+        g, g1, g2, g3 = derivatives(v_roots.T)
+    g, g1, g2, g3 = g.T, g1.T, g2.T, g3.T
+    p2 = _polyval_batch(d2[:, None, :], x_roots)
+    curvature = p2 * g1**2
+    valid &= curvature > 0
+    choice = np.where(valid, np.abs(x_roots - x_min), np.inf).argmin(axis=-1)[:, None]
+    found = np.take_along_axis(valid, choice, axis=-1)[:, 0]
+
+    def pick(a):
+        return np.where(found, np.take_along_axis(a, choice, axis=-1)[:, 0], np.nan)
+
+    x_eq = pick(x_roots)
+    p3 = _polyval_batch(d3, x_eq)
+    g1_eq, g2_eq, g3_eq = pick(g1), pick(g2), pick(g3)
+    return {
+        "volume_eq": pick(v_roots),
+        "energy_eq": _polyval_batch(coeff, x_eq),
+        "d2E": pick(curvature),
+        "d3E": p3 * g1_eq**3 + 3 * pick(p2) * g1_eq * g2_eq,
+    }
+
+
+def _murnaghan(volumes, e0, v0, b0, bp):
+    return (
+        e0
+        + b0 * volumes / bp * ((v0 / volumes) ** bp / (bp - 1) + 1)
+        - v0 * b0 / (bp - 1)
+    )
+
+
+def fit_energy_volume_curves(
+    volumes, energies, fit_type="polynomial", fit_order=3, max_iter=50
+):
+    """
+    Fit many energy volume curves at once.
+
+        Parameters:
+            volumes, energies: arrays of shape (n_curves, n_points) in A^3 and eV
+            fit_type: polynomial, birchmurnaghan or murnaghan
+            fit_order: order of the polynomial (in V or V^(-2/3) for birchmurnaghan)
+            max_iter: Levenberg-Marquardt iterations of the murnaghan fit
+
+        Returns:
+            dict: volume_eq, energy_eq, bulkmodul_eq (GPa) and b_prime_eq, one
+                entry per curve, nan where no minimum was found
+    """
+    import numpy as np
+    from scipy.constants import eV
+
+    eV_per_A3_to_GPa = eV * 1e21
+    volumes = np.atleast_2d(np.asarray(volumes, dtype=float))
+    energies = np.atleast_2d(np.asarray(energies, dtype=float))
+    if fit_type in ["polynomial", "birchmurnaghan"]:
+        fit = _fit_polynomial_eos(
+            volumes,
+            energies,
+            fit_order=fit_order if fit_type == "polynomial" else 3,
+            transform=fit_type,
+        )
+        v_eq = fit["volume_eq"]
+        return {
+            "volume_eq": v_eq,
+            "energy_eq": fit["energy_eq"],
+            "bulkmodul_eq": v_eq * fit["d2E"] * eV_per_A3_to_GPa,
+            "b_prime_eq": -1 - v_eq * fit["d3E"] / fit["d2E"],
+        }
+    elif fit_type == "murnaghan":
+        # batched Levenberg-Marquardt starting from the Birch-Murnaghan fit
+        start = fit_energy_volume_curves(volumes, energies, fit_type="birchmurnaghan")
+        params = np.stack(
+            [
+                start["energy_eq"],
+                start["volume_eq"],
+                start["bulkmodul_eq"] / eV_per_A3_to_GPa,
+                start["b_prime_eq"],
+            ],
+            axis=-1,
+        )
+        params = np.where(
+            np.isfinite(params),
+            params,
+            [energies.min(), volumes.mean(), 0.5, 4.0],
+        )
+        damping = np.full(len(volumes), 1e-3)
+
+        def residual(p):
+            return _murnaghan(volumes, *(p[:, i, None] for i in range(4))) - energies
+
+        r = residual(params)
+        for _ in range(max_iter):
+            step = 1e-6 * np.maximum(np.abs(params), 1e-6)
+            jac = np.stack(
+                [
+                    (residual(params + np.eye(4)[i] * step) - r) / step[:, i, None]
+                    for i in range(4)
+                ],
+                axis=-1,
+            )
+            jtj = np.einsum("npi,npj->nij", jac, jac)
+            jtr = np.einsum("npi,np->ni", jac, r)
+            a = jtj + damping[:, None, None] * (
+                jtj * np.eye(4) + 1e-12 * np.eye(4)
+            )
+            delta = -np.linalg.solve(a, jtr[..., None])[..., 0]
+            r_new = residual(params + delta)
+            better = np.sum(r_new**2, axis=-1) < np.sum(r**2, axis=-1)
+            params = np.where(better[:, None], params + delta, params)
+            r = np.where(better[:, None], r_new, r)
+            damping = np.where(better, damping / 10, damping * 10)
+        return {
+            "volume_eq": params[:, 1],
+            "energy_eq": params[:, 0],
+            "bulkmodul_eq": params[:, 2] * eV_per_A3_to_GPa,
+            "b_prime_eq": params[:, 3],
+        }
+    else:
+        raise ValueError("The fit_type is not implemented:", fit_type)
 
 
 @Workflow.wrap.as_function_node
@@ -39,9 +631,91 @@ def generate_structures(structure, vol_range, num_points):
     )
 
 
+def _get_cache(cache, cache_directory):
+    if cache is None and cache_directory is not None:
+        return get_lammps_result_cache(cache_directory)
+    return cache
+
+
+def _evaluate_energies(
+    task_dict, potential_dataframe, max_workers=None, cache=None, executor=None
+):
+    if cache is not None:
+        return evaluate_with_lammps_cached(
+            task_dict=task_dict,
+            potential_dataframe=potential_dataframe,
+            cache=cache,
+            max_workers=max_workers,
+            executor=executor,
+        )
+    return evaluate_with_lammps_parallel(
+        task_dict=task_dict,
+        potential_dataframe=potential_dataframe,
+        max_workers=max_workers,
+        executor=executor,
+    )
+
+
 @Workflow.wrap.as_function_node
-def evaluate_with_lammps_wf(task_dict, potential_dataframe):
-    return evaluate_with_lammps(task_dict={"calc_energy": task_dict}, potential_dataframe=potential_dataframe)
+def evaluate_with_lammps_wf(
+    task_dict, potential_dataframe, max_workers=None, cache_directory=None, cache=None
+):
+    # the hit and miss statistics are available as cache.stats, for a
+    # cache_directory as get_lammps_result_cache(cache_directory).stats
+    return _evaluate_energies(
+        task_dict={"calc_energy": task_dict},
+        potential_dataframe=potential_dataframe,
+        max_workers=max_workers,
+        cache=_get_cache(cache, cache_directory),
+    )
+
+
+@Workflow.wrap.as_function_node
+def adaptive_sampling_with_lammps_wf(
+    structure,
+    vol_range,
+    potential_dataframe,
+    max_points=21,
+    tolerance=1e-3,
+    max_workers=None,
+    cache_directory=None,
+    cache=None,
+    num_initial_points=5,
+):
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    cache = _get_cache(cache, cache_directory)
+    # one pool for the whole run, sized for the initial points, every added
+    # volume is a single task on one of its workers
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers or os.cpu_count(), num_initial_points)
+    ) as exe:
+
+        def evaluate(task_dict):
+            return _evaluate_energies(
+                task_dict=task_dict,
+                potential_dataframe=potential_dataframe,
+                cache=cache,
+                executor=exe,
+            )
+
+        structure_dict, output_dict = adaptive_energy_volume_sampling(
+            structure=structure,
+            vol_range=vol_range,
+            evaluate=evaluate,
+            num_initial_points=num_initial_points,
+            max_points=max_points,
+            tolerance=tolerance,
+        )
+    return structure_dict, output_dict
+
+
+@Workflow.wrap.as_function_node
+def evaluate_with_lammps_session_wf(task_dict, potential_dataframe):
+    return evaluate_with_lammps_session(
+        task_dict={"calc_energy": task_dict},
+        potential_dataframe=potential_dataframe,
+    )
 
 
 @Workflow.wrap.as_function_node
@@ -55,6 +729,29 @@ def analyse_structures(output_dict, structure_dict):
     )
 
 
+@Workflow.wrap.as_function_node
+def analyse_structures_batch(
+    output_dict_lst, structure_dict_lst, fit_type="polynomial", fit_order=3
+):
+    import numpy as np
+    volumes = np.array(
+        [
+            [structure.get_volume() for structure in structure_dict.values()]
+            for structure_dict in structure_dict_lst
+        ]
+    )
+    energies = np.array(
+        [
+            [output_dict["energy"][k] for k in structure_dict.keys()]
+            for output_dict, structure_dict in zip(output_dict_lst, structure_dict_lst)
+        ]
+    )
+    fit_dict = fit_energy_volume_curves(
+        volumes=volumes, energies=energies, fit_type=fit_type, fit_order=fit_order
+    )
+    return fit_dict
+
+
 @Workflow.wrap.as_function_node
 def plot(fit_dict):
     import matplotlib.pyplot as plt
@@ -4,17 +4,96 @@ TODO
 """
 from pyiron_workflow import Workflow
 
+
+class PotentialCatalog:
+    """
+    Process-wide catalog of the LAMMPS potentials. The potential table is
+    parsed once and indexed by name and by element set, the potential details
+    are memoized per name. With an index_file the parsed table is stored with
+    pickle and read from there on the next cold start (delete the file to pick
+    up newly installed potentials).
+    """
+
+    def __init__(self, index_file=None):
+        self._index_file = index_file
+        self._df = None
+        self._name_index = None
+        self._element_index = None
+        self._potential_dict = {}
+
+    def _load(self):
+        import os
+        import pandas
+        if self._index_file is not None and os.path.exists(self._index_file):
+            df = pandas.read_pickle(self._index_file)
+        else:
+            from pyiron_atomistics.lammps.potential import LammpsPotentialFile
+            df = LammpsPotentialFile().list()
+            if self._index_file is not None:
+                df.to_pickle(self._index_file)
+        self._df = df.reset_index(drop=True)
+        self._name_index = {name: i for i, name in enumerate(self._df["Name"])}
+        self._element_index = {}
+        for name, species in zip(self._df["Name"], self._df["Species"]):
+            self._element_index.setdefault(frozenset(species), []).append(name)
+
+    @property
+    def df(self):
+        if self._df is None:
+            self._load()
+        return self._df
+
+    def find_by_name(self, pot_str):
+        """Same as LammpsPotentialFile().find_by_name() but O(1)"""
+        self.df
+        return self._df.iloc[[self._name_index[pot_str]]]
+
+    def find_by_elements(self, elements):
+        """Names of the potentials for exactly the given set of elements"""
+        self.df
+        return list(self._element_index.get(frozenset(elements), []))
+
+    def get(self, pot_str):
+        """
+        Config, files, elements and LammpsPotential of a potential. The parsed
+        row is memoized, every call gets new lists and a new LammpsPotential,
+        so callers can modify them without affecting later calls.
+        """
+        from pyiron_atomistics.lammps.potential import LammpsPotential
+
+        if pot_str not in self._potential_dict:
+            potential = self.find_by_name(pot_str)
+            element_list = LammpsPotential()
+            element_list.df = potential
+            self._potential_dict[pot_str] = (
+                potential,
+                tuple(potential["Config"].iloc[0]),
+                tuple(potential["Filename"].iloc[0]),
+                tuple(element_list.get_element_lst()),
+            )
+        potential, config, files, elements = self._potential_dict[pot_str]
+        df = potential.copy()
+        for column in ["Config", "Filename", "Species"]:
+            df[column] = [list(df[column].iloc[0])]
+        element_list = LammpsPotential()
+        element_list.df = df
+        return list(config), list(files), list(elements), element_list
+
+
+_potential_catalog = PotentialCatalog()
+
+
+def get_potential_catalog(index_file=None):
+    """Return the process-wide PotentialCatalog, optionally backed by an index_file"""
+    global _potential_catalog
+    if index_file is not None and _potential_catalog._index_file != index_file:
+        _potential_catalog = PotentialCatalog(index_file=index_file)
+    return _potential_catalog
+
+
 @Workflow.wrap.as_function_node()
-def obtain_potential(pot_str:str):
-    from pyiron_atomistics.lammps.potential import LammpsPotentialFile,LammpsPotential
-
-    # Potential file details
-    potential = LammpsPotentialFile().find_by_name(pot_str)
-    config = potential['Config'].iloc[0]
-    files = potential['Filename'].iloc[0]
-
-    # Element list of the potential
-    element_list = LammpsPotential()
-    element_list.df = potential
-    elements = element_list.get_element_lst()
-    return config, files, elements, element_list  
\ No newline at end of file
+def obtain_potential(pot_str:str, index_file:str=None):
+    # Potential file details and element list of the potential, parsed once per
+    # process, with an index_file the parsed potential table is kept on disk
+    config, files, elements, element_list = get_potential_catalog(index_file).get(pot_str)
+    return config, files, elements, element_list